@@ -0,0 +1,78 @@
+# Great-circle (straight-line) distance helpers for FoodiesRN
+# Computes haversine distances for a whole array of candidates in one NumPy pass
+import numpy as np
+
+EARTH_RADIUS_METERS = 6371000.0
+METERS_PER_MILE = 1609.344
+
+
+def haversine_distances(origin_lat, origin_lng, lats, lngs):
+    """
+    Great-circle distances from one origin to many points.
+    `lats` and `lngs` are array-likes in degrees; returns (meters, miles) arrays.
+    """
+    lat1 = np.radians(origin_lat)
+    lon1 = np.radians(origin_lng)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    lon2 = np.radians(np.asarray(lngs, dtype=float))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    meters = 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+    return meters, meters / METERS_PER_MILE
+
+
+def restaurant_coordinates(restaurants):
+    """
+    Pull (lat, lng) arrays out of Yelp-style restaurant dicts.
+    Restaurants without usable coordinates get NaN, which stays NaN through
+    the distance math.
+    """
+    lats = np.full(len(restaurants), np.nan)
+    lngs = np.full(len(restaurants), np.nan)
+    for i, restaurant in enumerate(restaurants):
+        coords = restaurant.get('coordinates') or {}
+        if coords.get('latitude') is not None and coords.get('longitude') is not None:
+            lats[i] = coords['latitude']
+            lngs[i] = coords['longitude']
+    return lats, lngs
+
+
+def straight_line_miles(origin_lat, origin_lng, restaurants):
+    """Straight-line miles from the origin to each restaurant (NaN if no coordinates)"""
+    lats, lngs = restaurant_coordinates(restaurants)
+    _, miles = haversine_distances(origin_lat, origin_lng, lats, lngs)
+    return miles
+
+
+def prefilter_by_straight_line(origin_lat, origin_lng, restaurants, radius_miles):
+    """
+    Keep only restaurants whose straight-line distance is within the radius.
+    Driving distance can't be shorter than the great-circle distance, so this
+    drops nothing the driving-distance filter would have kept (restaurants
+    without coordinates can't be routed either and are dropped too).
+    """
+    if not restaurants:
+        return restaurants
+    miles = straight_line_miles(origin_lat, origin_lng, restaurants)
+    return [r for r, distance in zip(restaurants, miles) if distance <= radius_miles]
+
+
+def apply_straight_line_distances(origin_lat, origin_lng, restaurants, label="straight-line"):
+    """
+    Set straight-line `distance_meters` on every restaurant that has coordinates
+    and clear the driving fields, which is the fallback used whenever the route
+    matrix is unavailable.
+    """
+    lats, lngs = restaurant_coordinates(restaurants)
+    meters, miles = haversine_distances(origin_lat, origin_lng, lats, lngs)
+
+    for restaurant, distance_meters, distance_miles in zip(restaurants, meters, miles):
+        if np.isnan(distance_meters):
+            continue
+        restaurant['distance_meters'] = float(distance_meters)
+        restaurant['driving_distance_miles'] = None
+        restaurant['driving_duration_minutes'] = None
+        print(f"[DEBUG] {restaurant['name']}: {distance_miles:.2f} miles ({label})")
+    return restaurants
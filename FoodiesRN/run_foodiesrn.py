@@ -1,14 +1,42 @@
 import requests
 import os
+import math
 import random
 import google.generativeai as genai
 import pandas as pd
+import numpy as np
 import sqlalchemy as db
 from sqlalchemy import inspect
 from dotenv import load_dotenv
-from genai_utils import get_genai_model
+from genai_utils import (
+    get_genai_model,
+    genai_generate,
+    genai_text_cache,
+    text_cache_key,
+    parse_indexed_json,
+    JSON_LIST_INSTRUCTIONS,
+    JSON_GENERATION_CONFIG,
+)
+from shared.cache import TTLCache
+from shared import db as shared_db
+from shared.migrations import run_migrations
+from shared.upstream import get_upstream
+from shared.circuit import CircuitOpenError
+from shared import aio
+from shared.hydrate import restaurant_status
+from FoodiesRN.spatial_index import RestaurantIndex
+from FoodiesRN.distance import (
+    apply_straight_line_distances,
+    prefilter_by_straight_line,
+    straight_line_miles,
+    METERS_PER_MILE,
+)
 import time
 import json
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 
 # load environment variables
@@ -18,40 +46,91 @@ GENAI_KEY = os.getenv("GENAI_KEY")
 print("GENAI_KEY in Flask:", GENAI_KEY)
 GEOAPIFY_KEY = os.getenv("GEOAPIFY_KEY")
 
-
-# set up SQLAlchemy database engine
-engine = db.create_engine("sqlite:///preprn.db")
+# how long a Yelp search result stays cached, and how many decimals of GPS
+# coordinates count as "the same place" (3 decimals is roughly 100 meters)
+YELP_CACHE_TTL = int(os.getenv("YELP_CACHE_TTL", 6 * 60 * 60))
+YELP_CACHE_COORD_PRECISION = int(os.getenv("YELP_CACHE_COORD_PRECISION", 3))
+# v2: cached results carry the Yelp business id
+yelp_cache = TTLCache("yelp_search_cache_v2", ttl_seconds=YELP_CACHE_TTL)
+
+# filtered candidates of each search, kept briefly so /foodies/reroll can
+# serve alternate picks without calling Yelp or Geoapify again
+FOODIES_POOL_TTL = int(os.getenv("FOODIES_POOL_TTL", 30 * 60))
+candidate_pool_cache = TTLCache(
+    "foodies_candidate_pool",
+    ttl_seconds=FOODIES_POOL_TTL,
+    memory_size=256,
+    max_rows=int(os.getenv("FOODIES_POOL_MAX_ROWS", 2000)),
+)
+
+# pooled keep-alive client for Yelp Fusion
+yelp = get_upstream(
+    "yelp",
+    "https://api.yelp.com",
+    connect_timeout=float(os.getenv("YELP_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("YELP_READ_TIMEOUT", 8)),
+    retries=int(os.getenv("YELP_RETRIES", 2)),
+    max_retry_after=float(os.getenv("YELP_MAX_RETRY_AFTER", 2)),
+)
+
+# Yelp search paging: fetch further pages only while fewer than
+# YELP_MIN_CANDIDATES restaurants pass the cheap filters, at most
+# YELP_MAX_PAGES pages per search, YELP_PAGE_CONCURRENCY at a time.
+# Yelp caps offset + limit at 240.
+YELP_PAGE_SIZE = 50
+YELP_MAX_RESULTS = 240
+YELP_MAX_PAGES = int(os.getenv("YELP_MAX_PAGES", 3))
+YELP_MIN_CANDIDATES = int(os.getenv("YELP_MIN_CANDIDATES", 3))
+YELP_PAGE_CONCURRENCY = int(os.getenv("YELP_PAGE_CONCURRENCY", 2))
+_yelp_pool = ThreadPoolExecutor(max_workers=YELP_PAGE_CONCURRENCY, thread_name_prefix="yelp")
+
+# driving routes are cached per (origin grid cell, restaurant). The grid size is
+# in degrees; 0.005 is roughly a 500 meter square.
+GEOAPIFY_ORIGIN_GRID = float(os.getenv("GEOAPIFY_ORIGIN_GRID", 0.005))
+GEOAPIFY_ROUTE_CACHE_TTL = int(os.getenv("GEOAPIFY_ROUTE_CACHE_TTL", 7 * 24 * 60 * 60))
+route_cache = TTLCache(
+    "geoapify_route_cache",
+    ttl_seconds=GEOAPIFY_ROUTE_CACHE_TTL,
+    memory_size=2048,
+    max_rows=int(os.getenv("GEOAPIFY_ROUTE_CACHE_MAX_ROWS", 50000)),
+)
+
+# route matrix requests are split into chunks of this many targets which run
+# concurrently, each with its own timeout and retries
+GEOAPIFY_CHUNK_SIZE = int(os.getenv("GEOAPIFY_CHUNK_SIZE", 10))
+GEOAPIFY_TIMEOUT = float(os.getenv("GEOAPIFY_TIMEOUT", 8))
+GEOAPIFY_RETRIES = int(os.getenv("GEOAPIFY_RETRIES", 1))
+geoapify = get_upstream(
+    "geoapify",
+    "https://api.geoapify.com",
+    connect_timeout=float(os.getenv("GEOAPIFY_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=GEOAPIFY_TIMEOUT,
+    retries=GEOAPIFY_RETRIES,
+    max_retry_after=float(os.getenv("GEOAPIFY_MAX_RETRY_AFTER", 2)),
+)
+_geoapify_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEOAPIFY_MAX_WORKERS", 4)),
+    thread_name_prefix="geoapify",
+)
+
+
+# shared pooled SQLAlchemy database engine
+engine = shared_db.engine
 TABLE_RN = "foodiesrn_recommendations" # table name for storing recommendations
 
+# spatial index over every restaurant we have stored, loaded lazily from the DB
+# and kept up to date by save_to_db
+restaurant_index = RestaurantIndex(cell_degrees=float(os.getenv("RESTAURANT_INDEX_CELL_DEGREES", 0.05)))
+_index_load_lock = threading.Lock()
+
 
 def create_foodiesrn_table():
-    """Create the foodiesrn_recommendations table if it doesn't exist"""
-    with engine.connect() as connection:
-        connection.execute(db.text(f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_RN} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                location TEXT,
-                price TEXT,
-                rating REAL,
-                url TEXT,
-                user_location TEXT,
-                cuisine TEXT,
-                vibe TEXT,
-                user_id INTEGER,
-                image_url TEXT,
-                distance_meters REAL,
-                driving_distance_miles REAL,
-                driving_duration_minutes REAL,
-                loved BOOLEAN DEFAULT FALSE
-            )
-        """))
-        connection.commit()
+    """Make sure the schema is in place (the table itself is created by shared.migrations)"""
+    run_migrations()
 
 
 def clear_loved_restaurants_db(user_id):
     """Clear all loved restaurants for a specific user by setting loved = FALSE"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         connection.execute(
             db.text(f"UPDATE {TABLE_RN} SET loved = FALSE WHERE user_id = :uid"),
@@ -61,6 +140,22 @@ def clear_loved_restaurants_db(user_id):
     print("\nAll your loved restaurants have been cleared.")
 
 
+def snap_origin(lat, lng):
+    """
+    Snap a user location to the corner of its GEOAPIFY_ORIGIN_GRID cell, so that
+    searches from nearby points share route cache entries.
+    """
+    grid = GEOAPIFY_ORIGIN_GRID
+    return f"{math.floor(lat / grid) * grid:.5f},{math.floor(lng / grid) * grid:.5f}"
+
+
+def _apply_route(restaurant, distance_meters, time_seconds):
+    """Store a driving distance/time from the route matrix on a restaurant dict"""
+    restaurant['distance_meters'] = distance_meters
+    restaurant['driving_distance_miles'] = distance_meters / METERS_PER_MILE  # Convert to miles
+    restaurant['driving_duration_minutes'] = time_seconds / 60  # Convert to minutes
+
+
 def calculate_distances_with_geoapify(user_lat, user_lng, restaurants):
     """
     Calculate driving distances and times from user location to restaurants using Geoapify API.
@@ -72,171 +167,145 @@ def calculate_distances_with_geoapify(user_lat, user_lng, restaurants):
     if not GEOAPIFY_KEY:
         print("WARNING: GEOAPIFY_KEY not found. Distance filtering will use straight-line distance only.")
         # calculate straight-line distances as fallback
-        for restaurant in restaurants:
-            if 'coordinates' in restaurant:
-                rest_lat = restaurant['coordinates']['latitude']
-                rest_lng = restaurant['coordinates']['longitude']
-                
-                # haversine formula for straight-line distance
-                import math
-                
-                # convert latitude and longitude from degrees to radians
-                lat1, lon1, lat2, lon2 = map(math.radians, [user_lat, user_lng, rest_lat, rest_lng])
-                
-                # haversine formula
-                dlat = lat2 - lat1
-                dlon = lon2 - lon1
-                a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-                c = 2 * math.asin(math.sqrt(a))
-                
-                # radius of earth in kilometers is 6371
-                distance_km = 6371 * c
-                distance_meters = distance_km * 1000
-                
-                restaurant['distance_meters'] = distance_meters
-                restaurant['driving_distance_miles'] = None
-                restaurant['driving_duration_minutes'] = None
-                print(f"[DEBUG] {restaurant['name']}: {distance_meters / 1609.344:.2f} miles (straight-line)")
-        return restaurants
+        return apply_straight_line_distances(user_lat, user_lng, restaurants)
+
+    # look up every restaurant in the route cache first; only misses go to Geoapify
+    origin_cell = snap_origin(user_lat, user_lng)
+    misses = []  # (restaurant, cache_key) pairs that still need routing
 
-    # prepare sources and targets for API call
-    sources = [{"lat": user_lat, "lon": user_lng}]
-    targets = []
-    
     for restaurant in restaurants:
         if 'coordinates' in restaurant:
             rest_lat = restaurant['coordinates']['latitude']
             rest_lng = restaurant['coordinates']['longitude']
-            targets.append({"lat": rest_lat, "lon": rest_lng})
-            print(f"[DEBUG] Restaurant {restaurant['name']} coordinates: {rest_lat}, {rest_lng}")
-    
-    if not targets:
-        print("No restaurant coordinates found for distance calculation")
+            cache_key = f"{origin_cell}|{rest_lat:.5f},{rest_lng:.5f}"
+            cached = route_cache.get(cache_key)
+            if cached is not None:
+                _apply_route(restaurant, cached['distance'], cached['time'])
+                print(f"[DEBUG] {restaurant['name']}: {restaurant['driving_distance_miles']:.2f} miles (route cache)")
+            else:
+                misses.append((restaurant, cache_key))
+                print(f"[DEBUG] Restaurant {restaurant['name']} coordinates: {rest_lat}, {rest_lng}")
+
+    if not misses:
+        print(f"[TIMER] All {len(restaurants)} routes served from cache, skipping Geoapify")
         return restaurants
-    
-    print(f"[DEBUG] Making Geoapify API call with {len(sources)} sources and {len(targets)} targets")
-    
+
+    if not geoapify.breaker.available():
+        # Geoapify has been failing; don't wait on it, measure in straight lines
+        print("[DEBUG] Geoapify circuit open, using straight-line distance for uncached routes")
+        apply_straight_line_distances(user_lat, user_lng, [r for r, _ in misses], "circuit open")
+        return restaurants
+
+    # split the misses into chunks and route them concurrently; a chunk that
+    # fails only costs its own restaurants their driving data
+    chunks = [misses[i:i + GEOAPIFY_CHUNK_SIZE] for i in range(0, len(misses), GEOAPIFY_CHUNK_SIZE)]
+    print(f"[DEBUG] Making {len(chunks)} Geoapify API call(s) for {len(misses)} targets")
+
+    futures = [
+        _geoapify_pool.submit(_request_route_matrix, user_lat, user_lng, [r for r, _ in chunk])
+        for chunk in chunks
+    ]
+
+    unrouted = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            matrix = future.result()
+        except Exception as e:
+            print(f"Error calculating distances with Geoapify: {e}")
+            # fallback to straight-line distance calculation for this chunk only
+            apply_straight_line_distances(user_lat, user_lng, [r for r, _ in chunk], "error fallback")
+            continue
+
+        for i, (restaurant, cache_key) in enumerate(chunk):
+            route_info = matrix[i] if i < len(matrix) else {}
+
+            # get driving distance and time
+            if route_info.get('distance') is not None and route_info.get('time') is not None:
+                _apply_route(restaurant, route_info['distance'], route_info['time'])
+                route_cache.set(cache_key, {"distance": route_info['distance'], "time": route_info['time']})
+
+                print(f"[DEBUG] {restaurant['name']}: {restaurant['driving_distance_miles']:.2f} miles, {restaurant['driving_duration_minutes']:.1f} min")
+            else:
+                # API call failed for this restaurant, calculate straight-line distance
+                unrouted.append(restaurant)
+
+    apply_straight_line_distances(user_lat, user_lng, unrouted, "fallback straight-line")
+
+    print(f"[TIMER] Geoapify distance calculation completed for {len(restaurants)} restaurants")
+    return restaurants
+
+
+def _request_route_matrix(user_lat, user_lng, restaurants):
+    """
+    Ask the Geoapify Route Matrix API for driving routes from the user to each
+    restaurant. The Geoapify client retries transient failures up to
+    GEOAPIFY_RETRIES times; returns the row of route info for our single
+    source (one entry per restaurant).
+    """
     # make API call to Geoapify Route Matrix
-    url = "https://api.geoapify.com/v1/routematrix"
+    url = "/v1/routematrix"
     headers = {
         "Content-Type": "application/json"
     }
-    
+
     # request body in JSON format
     data = {
         "mode": "drive",
-        "sources": sources,
-        "targets": targets
+        "sources": [{"lat": user_lat, "lon": user_lng}],
+        "targets": [
+            {"lat": r['coordinates']['latitude'], "lon": r['coordinates']['longitude']}
+            for r in restaurants
+        ]
     }
-    
+
     params = {
         "apiKey": GEOAPIFY_KEY
     }
-    
-    try:
-        response = requests.post(url, headers=headers, json=data, params=params, timeout=15)
-        response.raise_for_status()
-        result = response.json()
-        
-        print(f"[DEBUG] Geoapify API response received. Keys: {result.keys()}")
-        
-        # parse results and add to restaurants
-        if 'sources_to_targets' in result and result['sources_to_targets']:
-            matrix = result['sources_to_targets'][0]
-            print(f"[DEBUG] Matrix length: {len(matrix)}")
-            
-            for i, restaurant in enumerate(restaurants):
-                if i < len(matrix) and 'coordinates' in restaurant:
-                    route_info = matrix[i]
-                    print(f"[DEBUG] Route info for {restaurant['name']}: {route_info}")
-                    
-                    # get driving distance and time
-                    if 'distance' in route_info and 'time' in route_info:
-                        distance_meters = route_info['distance']
-                        time_seconds = route_info['time']
-                        
-                        restaurant['distance_meters'] = distance_meters
-                        restaurant['driving_distance_miles'] = distance_meters / 1609.344  # Convert to miles
-                        restaurant['driving_duration_minutes'] = time_seconds / 60  # Convert to minutes
-                        
-                        print(f"[DEBUG] {restaurant['name']}: {restaurant['driving_distance_miles']:.2f} miles, {restaurant['driving_duration_minutes']:.1f} min")
-                    else:
-                        # API call failed for this restaurant, calculate straight-line distance
-                        rest_lat = restaurant['coordinates']['latitude']
-                        rest_lng = restaurant['coordinates']['longitude']
-                        
-                        import math
-                        lat1, lon1, lat2, lon2 = map(math.radians, [user_lat, user_lng, rest_lat, rest_lng])
-                        dlat = lat2 - lat1
-                        dlon = lon2 - lon1
-                        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-                        c = 2 * math.asin(math.sqrt(a))
-                        distance_km = 6371 * c
-                        distance_meters = distance_km * 1000
-                        
-                        restaurant['distance_meters'] = distance_meters
-                        restaurant['driving_distance_miles'] = None
-                        restaurant['driving_duration_minutes'] = None
-                        print(f"[DEBUG] {restaurant['name']}: {distance_meters / 1609.344:.2f} miles (fallback straight-line)")
-        else:
-            print("[DEBUG] No matrix found in API response")
-            print(f"[DEBUG] Full API response: {result}")
-        
-        print(f"[TIMER] Geoapify distance calculation completed for {len(restaurants)} restaurants")
-        return restaurants
-        
-    except Exception as e:
-        print(f"Error calculating distances with Geoapify: {e}")
-        # fallback to straight-line distance calculation
-        for restaurant in restaurants:
-            if 'coordinates' in restaurant:
-                rest_lat = restaurant['coordinates']['latitude']
-                rest_lng = restaurant['coordinates']['longitude']
-                
-                import math
-                lat1, lon1, lat2, lon2 = map(math.radians, [user_lat, user_lng, rest_lat, rest_lng])
-                dlat = lat2 - lat1
-                dlon = lon2 - lon1
-                a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-                c = 2 * math.asin(math.sqrt(a))
-                distance_km = 6371 * c
-                distance_meters = distance_km * 1000
-                
-                restaurant['distance_meters'] = distance_meters
-                restaurant['driving_distance_miles'] = None
-                restaurant['driving_duration_minutes'] = None
-                print(f"[DEBUG] {restaurant['name']}: {distance_meters / 1609.344:.2f} miles (error fallback)")
-        
-        return restaurants
 
+    # the pooled client retries connection errors, 429 and 5xx responses
+    response = geoapify.post(url, headers=headers, json=data, params=params)
+    response.raise_for_status()
+    result = response.json()
 
-def filter_by_radius(restaurants, radius_miles):
-    """Filter restaurants based on radius in miles"""
-    filtered = []
-    
+    # parse results
+    if result.get('sources_to_targets'):
+        return result['sources_to_targets'][0]
+    raise ValueError(f"No matrix found in API response: {result}")
+
+
+def filter_by_radius(restaurants, radius_miles, origin=None):
+    """
+    Filter restaurants based on radius in miles.
+    Driving distance is used when available, then any stored straight-line
+    distance. If `origin` (lat, lng) is given, restaurants with neither are
+    measured from it in one vectorized haversine pass.
+    """
     print(f"[DEBUG] Filtering {len(restaurants)} restaurants by {radius_miles} mile radius")
-    
-    for restaurant in restaurants:
-        # use driving distance if available, otherwise use straight-line distance
+
+    # use driving distance if available, otherwise use straight-line distance
+    miles = np.full(len(restaurants), np.nan)
+    for i, restaurant in enumerate(restaurants):
         if restaurant.get('driving_distance_miles') is not None:
-            distance_miles = restaurant['driving_distance_miles']
-            distance_type = "driving"
+            miles[i] = restaurant['driving_distance_miles']
         elif restaurant.get('distance_meters') is not None:
-            distance_miles = restaurant['distance_meters'] / 1609.344  # convert meters to miles
-            distance_type = "straight-line"
-        else:
-            # no distance data available, skip this restaurant
+            miles[i] = restaurant['distance_meters'] / METERS_PER_MILE
+
+    missing = np.flatnonzero(np.isnan(miles))
+    if origin is not None and len(missing):
+        miles[missing] = straight_line_miles(origin[0], origin[1], [restaurants[i] for i in missing])
+
+    # NaN (no distance data at all) compares False, so those are skipped
+    within = miles <= radius_miles
+    filtered = [r for r, keep in zip(restaurants, within) if keep]
+
+    for restaurant, distance_miles, keep in zip(restaurants, miles, within):
+        if np.isnan(distance_miles):
             print(f"[DEBUG] {restaurant['name']}: No distance data available, skipping")
-            continue
-        
-        print(f"[DEBUG] {restaurant['name']}: {distance_miles:.2f} miles ({distance_type})")
-        
-        if distance_miles <= radius_miles:
-            filtered.append(restaurant)
-            print(f"[DEBUG] [YES] {restaurant['name']} included (within {radius_miles} miles)")
+        elif keep:
+            print(f"[DEBUG] [YES] {restaurant['name']} included ({distance_miles:.2f} miles, within {radius_miles} miles)")
         else:
             print(f"[DEBUG] [NO] {restaurant['name']} excluded ({distance_miles:.2f} > {radius_miles} miles)")
-    
+
     print(f"[DEBUG] Filtered results: {len(filtered)} restaurants within {radius_miles} miles")
     return filtered
 
@@ -287,9 +356,47 @@ price_map = {
 }
 
 
+def yelp_cache_key(user_input):
+    """
+    Build a normalized cache key for a Yelp search so that equivalent queries
+    (different casing, extra whitespace, GPS jitter) share one cache entry.
+    """
+    def norm(value):
+        return " ".join(str(value or "").split()).casefold()
+
+    if user_input.get("latitude") and user_input.get("longitude"):
+        # coordinates replace the location param in the Yelp query
+        lat = round(float(user_input["latitude"]), YELP_CACHE_COORD_PRECISION)
+        lng = round(float(user_input["longitude"]), YELP_CACHE_COORD_PRECISION)
+        where = f"{lat:.{YELP_CACHE_COORD_PRECISION}f},{lng:.{YELP_CACHE_COORD_PRECISION}f}"
+    else:
+        where = norm(user_input.get("location"))
+
+    return "|".join([
+        where,
+        norm(user_input.get("cuisine")),
+        price_map.get(user_input.get("price"), norm(user_input.get("price"))),
+        norm(user_input.get("vibe")),
+    ])
+
+
 # yelp API call to search for restaurants based on user input
 # https://docs.developer.yelp.com/reference/v3_business_search
-def search_yelp(user_input):
+def search_yelp(user_input, offset=0):
+    cache_key = yelp_cache_key(user_input)
+    if offset:
+        # later pages are cached separately from the first one
+        cache_key = f"{cache_key}|offset={offset}"
+    cached = yelp_cache.get(cache_key)
+    if cached is not None:
+        print(f"[DEBUG] Yelp cache hit for '{cache_key}' ({yelp_cache.stats()['hit_rate']:.0%} hit rate)")
+        return cached
+
+    # identical searches already in flight (same normalized key) share one Yelp call
+    return yelp.coalesce(cache_key, _fetch_yelp_page, user_input, offset, cache_key)
+
+
+def _fetch_yelp_page(user_input, offset, cache_key):
     headers = {
         "Authorization": f"Bearer {YELP_KEY}"
     }
@@ -299,8 +406,10 @@ def search_yelp(user_input):
         "term": f"{user_input['cuisine']} {user_input['vibe']}",
         "categories": (user_input.get("cuisine") or "").lower(),
         "price": price_map[user_input["price"]],
-        "limit": 50
+        "limit": YELP_PAGE_SIZE
     }
+    if offset:
+        params["offset"] = offset
 
     if user_input.get("latitude") and user_input.get("longitude"):
         params["latitude"] = user_input["latitude"]
@@ -308,8 +417,13 @@ def search_yelp(user_input):
         # remove location param when using coordinates
         del params["location"]
 
-    url = "https://api.yelp.com/v3/businesses/search"
-    response = requests.get(url, headers=headers, params=params)
+    url = "/v3/businesses/search"
+    try:
+        response = yelp.get(url, headers=headers, params=params)
+    except (requests.RequestException, CircuitOpenError) as e:
+        # an empty result sends the caller to the spatial index fallback
+        print("Yelp API Error:", e)
+        return []
 
     if response.status_code == 200:
         data = response.json()
@@ -319,6 +433,7 @@ def search_yelp(user_input):
         results = []
         for biz in businesses:
             results.append({
+                "yelp_id": biz.get("id"),
                 "name": biz["name"],
                 "rating": biz["rating"],
                 "price": biz.get("price", "N/A"),
@@ -330,6 +445,8 @@ def search_yelp(user_input):
                 "coordinates": biz.get("coordinates", {})
             })
 
+        yelp_cache.set(cache_key, results)
+
         # this will eventually be sent to google genai after final selection
         return results
 
@@ -339,13 +456,94 @@ def search_yelp(user_input):
         return []
 
 
+def search_yelp_adaptive(user_input, qualifies=None, min_candidates=None, max_pages=None):
+    """
+    Page through Yelp results until at least `min_candidates` restaurants pass
+    `qualifies` (a cheap per-restaurant filter), Yelp runs out of results, or
+    `max_pages` pages have been requested. The first page is fetched alone so
+    dense areas still cost one call; later pages go out concurrently in small
+    waves. Duplicates across pages are dropped, page order is kept.
+    """
+    qualifies = qualifies or (lambda restaurant: True)
+    min_candidates = YELP_MIN_CANDIDATES if min_candidates is None else min_candidates
+    max_pages = YELP_MAX_PAGES if max_pages is None else max_pages
+    offsets = [
+        page * YELP_PAGE_SIZE for page in range(max_pages)
+        if page * YELP_PAGE_SIZE + YELP_PAGE_SIZE <= YELP_MAX_RESULTS
+    ]
+
+    results = []
+    seen = set()
+    qualifying = 0
+    pages_fetched = 0
+
+    def collect(page):
+        nonlocal qualifying
+        for restaurant in page:
+            key = (restaurant["name"], restaurant["location"])
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(restaurant)
+            if qualifies(restaurant):
+                qualifying += 1
+
+    waves = [offsets[:1]] + [
+        offsets[i:i + YELP_PAGE_CONCURRENCY] for i in range(1, len(offsets), YELP_PAGE_CONCURRENCY)
+    ]
+    for wave in waves:
+        if not wave:
+            break
+        if len(wave) == 1:
+            pages = [search_yelp(user_input, wave[0])]
+        else:
+            pages = list(_yelp_pool.map(lambda offset: search_yelp(user_input, offset), wave))
+        pages_fetched += len(pages)
+
+        exhausted = False
+        for page in pages:
+            collect(page)
+            # a short page means Yelp has nothing further
+            if len(page) < YELP_PAGE_SIZE:
+                exhausted = True
+                break
+        if exhausted or qualifying >= min_candidates:
+            break
+
+    print(f"[DEBUG] Yelp paging fetched {pages_fetched} page(s), {len(results)} restaurants, {qualifying} qualifying")
+    return results
+
+
+# bump when the blurb prompt changes so cached blurbs are regenerated
+BLURB_PROMPT_VERSION = "restaurant-blurb-v1"
+
+
 # generate GenAI-powered blurbs for each restaurant (disabled)
 def generate_blurbs(businesses, user_input):
+    # reuse blurbs already generated for the same restaurant and vibe
+    keys = [text_cache_key(BLURB_PROMPT_VERSION, biz["name"], user_input["vibe"]) for biz in businesses]
+    blurbs = [genai_text_cache.get(key) for key in keys]
+    uncached = [i for i, blurb in enumerate(blurbs) if blurb is None]
+    if not uncached:
+        return blurbs
+
+    generated = _generate_blurbs_with_genai([businesses[i] for i in uncached], user_input)
+    for i, blurb in zip(uncached, generated):
+        if blurb:
+            genai_text_cache.set(keys[i], blurb)
+        blurbs[i] = blurb
+
+    # fall back per restaurant wherever the model left a gap
+    return [blurb or "No blurb available." for blurb in blurbs]
+
+
+def _generate_blurbs_with_genai(businesses, user_input):
     model = get_genai_model(GENAI_KEY, model_name="gemini-1.5-flash")
 
     prompt = (
-        "Write short, Gen Z-style blurbs (2 sentences) numbered (1., 2., 3.). "
-        "No restaurant names. No emojis. Include 'people are saying' with your positive opnions.\n\n"
+        "Write short, Gen Z-style blurbs (2 sentences) for each numbered restaurant. "
+        "No restaurant names. No emojis. Include 'people are saying' with your positive opnions.\n"
+        f"{JSON_LIST_INSTRUCTIONS}\n\n"
     )
 
     for i, biz in enumerate(businesses, 1):
@@ -356,40 +554,16 @@ def generate_blurbs(businesses, user_input):
             f"Vibe: {user_input['vibe']}\n\n"
         )
 
-    response_chunks = model.generate_content(prompt, stream=True)
-
-    full_text = ""
-    for chunk in response_chunks:
-        if hasattr(chunk, "text"):
-            full_text += chunk.text
-
-    if not full_text.strip():
-        return ["No blurb available."] * len(businesses)
-
-
-    raw_blurbs = full_text.strip().split("\n\n")
-    blurbs = []
-
-    for blurb in raw_blurbs:
-        if "." in blurb:
-            parts = blurb.split(".", 1)
-            if len(parts) == 2:
-                blurbs.append(parts[1].strip())
-            else:
-                blurbs.append(blurb.strip())
-        else:
-            blurbs.append(blurb.strip())
-
-    # ensure we return the same number of blurbs as restaurants
-    while len(blurbs) < len(businesses):
-        blurbs.append("No blurb available.")
-
-    return blurbs
+    try:
+        response = genai_generate(model, prompt, generation_config=JSON_GENERATION_CONFIG)
+        return parse_indexed_json(response.text, len(businesses))
+    except Exception as e:
+        print(f"GenAI blurb error: {e}")
+        return [None] * len(businesses)
 
 
 # clear all saved restaurant recommendations in the DB
 def clear_rec_table():
-    create_foodiesrn_table()
     with engine.connect() as connection:
         connection.execute(db.text(f"DELETE FROM {TABLE_RN}"))
         connection.commit()
@@ -397,37 +571,113 @@ def clear_rec_table():
 
 # save new results to the DB only if they don’t already exist
 def save_to_db(results, user_id):
-    create_foodiesrn_table()
+    """
+    Upsert a result set in one transaction. Rows are keyed on
+    (user_id, yelp_id), so a restaurant seen again gets its details refreshed
+    while the user's loved flag and notes are left alone. A restaurant the
+    user saved before rows had a yelp_id takes over that legacy row, and
+    results without a yelp_id are only added if the place isn't saved yet.
+    """
+    if not results:
+        return
+
+    rows = [
+        {"yelp_id": None, "latitude": None, "longitude": None, "loved": False, **r, "user_id": user_id}
+        for r in results
+    ]
+    with_id = [row for row in rows if row["yelp_id"]]
+    without_id = [row for row in rows if not row["yelp_id"]]
+    columns = """
+        (yelp_id, name, location, price, rating, url, user_location, cuisine, vibe, user_id, image_url,
+        distance_meters, driving_distance_miles, driving_duration_minutes, loved, latitude, longitude)
+    """
+    values = """
+        :yelp_id, :name, :location, :price, :rating, :url, :user_location, :cuisine, :vibe, :user_id, :image_url,
+        :distance_meters, :driving_distance_miles, :driving_duration_minutes, :loved, :latitude, :longitude
+    """
+    same_place = "user_id = :user_id AND name = :name AND location IS :location"
+
     with engine.connect() as connection:
-        for r in results:
-            exists = connection.execute(
+        if with_id:
+            # give a legacy row for the same place this business's id, so
+            # the upsert below updates it instead of adding a second row
+            connection.execute(
+                db.text(f"""
+                    UPDATE {TABLE_RN} SET yelp_id = :yelp_id
+                    WHERE id = (SELECT MIN(id) FROM {TABLE_RN} WHERE {same_place} AND yelp_id IS NULL)
+                      AND NOT EXISTS (SELECT 1 FROM {TABLE_RN} WHERE user_id = :user_id AND yelp_id = :yelp_id)
+                """),
+                with_id
+            )
+            connection.execute(
                 db.text(f"""
-                    SELECT 1 FROM {TABLE_RN} 
-                    WHERE user_id = :uid AND name = :name
+                    INSERT INTO {TABLE_RN} {columns}
+                    VALUES ({values})
+                    ON CONFLICT (user_id, yelp_id) DO UPDATE SET
+                        name = excluded.name,
+                        location = excluded.location,
+                        price = excluded.price,
+                        rating = excluded.rating,
+                        url = excluded.url,
+                        user_location = excluded.user_location,
+                        cuisine = excluded.cuisine,
+                        vibe = excluded.vibe,
+                        image_url = excluded.image_url,
+                        distance_meters = excluded.distance_meters,
+                        driving_distance_miles = excluded.driving_distance_miles,
+                        driving_duration_minutes = excluded.driving_duration_minutes,
+                        latitude = excluded.latitude,
+                        longitude = excluded.longitude
                 """),
-                {"uid": user_id, "name": r["name"]}
-            ).fetchone()
-
-            if not exists:
-                if 'loved' not in r:
-                    r['loved'] = False
-
-                connection.execute(
-                    db.text(f"""
-                        INSERT INTO {TABLE_RN} 
-                        (name, location, price, rating, url, user_location, cuisine, vibe, user_id, image_url,
-                        distance_meters, driving_distance_miles, driving_duration_minutes, loved)
-                        VALUES (:name, :location, :price, :rating, :url, :user_location, :cuisine, :vibe, :user_id, :image_url,
-                        :distance_meters, :driving_distance_miles, :driving_duration_minutes, :loved)
-                    """),
-                    r
-                )
+                with_id
+            )
+        if without_id:
+            # NULL ids never conflict in the unique index, so check by place
+            connection.execute(
+                db.text(f"""
+                    INSERT INTO {TABLE_RN} {columns}
+                    SELECT {values}
+                    WHERE NOT EXISTS (SELECT 1 FROM {TABLE_RN} WHERE {same_place})
+                """),
+                without_id
+            )
         connection.commit()
 
+    # keep the spatial index in step with the table
+    restaurant_index.add_many(results)
+
+
+def _load_restaurant_index():
+    """Build the spatial index from stored restaurant coordinates (once per process)"""
+    if restaurant_index.loaded:
+        return
+    with _index_load_lock:
+        if restaurant_index.loaded:
+            return
+        with engine.connect() as connection:
+            rows = connection.execute(
+                db.text(f"""
+                    SELECT yelp_id, name, location, price, rating, url, image_url, cuisine, latitude, longitude
+                    FROM {TABLE_RN}
+                    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                """)
+            ).mappings().fetchall()
+        restaurant_index.add_many(rows)
+        restaurant_index.loaded = True
+        print(f"[DEBUG] Restaurant index loaded with {len(restaurant_index)} restaurants")
+
+
+def find_known_restaurants(lat, lng, radius_miles, cuisine=None, limit=None):
+    """
+    Restaurants we have stored before that lie within `radius_miles` of
+    (lat, lng), nearest first, in the same shape search_yelp returns.
+    """
+    _load_restaurant_index()
+    return restaurant_index.query(lat, lng, radius_miles, cuisine=cuisine, limit=limit)
+
 
 # retrieve previously saved recommendations from the DB
 def view_saved_recommendations(user_id):
-    create_foodiesrn_table()
     with engine.connect() as connection:
         results = connection.execute(
             db.text(f"""
@@ -447,7 +697,6 @@ def view_saved_recommendations(user_id):
 
 def delete_individual_restaurant(user_id, restaurant_name, restaurant_location):
     """Delete a specific restaurant recommendation for a user"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         connection.execute(
             db.text(f"""
@@ -462,7 +711,6 @@ def delete_individual_restaurant(user_id, restaurant_name, restaurant_location):
 
 # remove all saved recommendations for a specific user
 def clear_saved_recommendations(user_id):
-    create_foodiesrn_table()
     with engine.connect() as connection:
         connection.execute(
             db.text(f"DELETE FROM {TABLE_RN} WHERE user_id = :uid"),
@@ -475,7 +723,6 @@ def clear_saved_recommendations(user_id):
 # toggle love status for a restaurant
 def toggle_restaurant_love(user_id, restaurant_name, restaurant_location):
     """Toggle the loved status of a restaurant"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         # first check if restaurant exists and get current loved status
         result = connection.execute(
@@ -505,7 +752,6 @@ def toggle_restaurant_love(user_id, restaurant_name, restaurant_location):
 # get loved restaurants for a user
 def get_loved_restaurants(user_id):
     """Get all loved restaurants for a user"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         results = connection.execute(
             db.text(f"""
@@ -519,135 +765,211 @@ def get_loved_restaurants(user_id):
     return results
 
 
-# main function to run Yelp + GenAI-based restaurant recommendation pipeline
-def run_restaurant_search(user_input, user_id):
+def _candidate_filter(user_input):
+    """
+    The cheap checks a restaurant has to pass to count towards the Yelp paging
+    target: the rating cut and, when we know where the user is, being inside
+    the radius in a straight line.
+    """
+    try:
+        radius_miles = float(user_input.get("radius") or 0)
+    except ValueError:
+        radius_miles = 0
+    origin = None
+    if user_input.get("latitude") and user_input.get("longitude") and radius_miles > 0:
+        origin = (float(user_input["latitude"]), float(user_input["longitude"]))
+
+    def qualifies(restaurant):
+        if restaurant["rating"] <= 3.5:
+            return False
+        if origin is None:
+            return True
+        miles = straight_line_miles(origin[0], origin[1], [restaurant])[0]
+        return bool(miles <= radius_miles)
+
+    return qualifies
+
+
+# how many picks a search (or reroll) shows
+RECOMMENDATION_COUNT = 3
+
+
+# radius used for the spatial index fallback when the user didn't pick one
+DEFAULT_FALLBACK_RADIUS_MILES = 10
+
+
+# main function to run Yelp + GenAI-based restaurant recommendation pipeline.
+# Returns (recommendations, pool_id); the pool id can be passed to
+# reroll_recommendations for alternate picks from the same search.
+def search_restaurants_with_pool(user_input, user_id):
+    return aio.run_sync(search_restaurants_async(user_input, user_id))
+
+
+async def search_restaurants_async(user_input, user_id):
     print("\n🔍 Generating your personalized recommendations...\n")
+    has_gps = bool(user_input.get("latitude") and user_input.get("longitude"))
     start = time.time()
-    results = search_yelp(user_input)
+    yelp_search = aio.call(search_yelp_adaptive, user_input, qualifies=_candidate_filter(user_input))
+    if has_gps:
+        # load the spatial index from the DB while Yelp answers, so the
+        # fallback below costs nothing extra if we need it
+        results, _ = await asyncio.gather(yelp_search, aio.call_quietly(_load_restaurant_index))
+    else:
+        results = await yelp_search
     print(f"[TIMER] Yelp API took {time.time() - start:.2f} seconds")
 
     # calculate distances if GPS coordinates are provided
-    if user_input.get("latitude") and user_input.get("longitude"):
-        start = time.time()
-        results = calculate_distances_with_geoapify(
-            float(user_input["latitude"]), 
-            float(user_input["longitude"]), 
-            results
-        )
-        print(f"[TIMER] Distance calculation took {time.time() - start:.2f} seconds")
-        
-        # filter by radius if specified
+    if has_gps:
+        user_lat = float(user_input["latitude"])
+        user_lng = float(user_input["longitude"])
         try:
-            radius_miles = float(user_input.get("radius", 0))
-            if radius_miles > 0:
-                before_count = len(results)
-                results = filter_by_radius(results, radius_miles)
-                print(f"[TIMER] Filtered from {before_count} to {len(results)} restaurants within {radius_miles} miles")
+            radius_miles = float(user_input.get("radius") or 0)
         except ValueError:
             print("[WARNING] Radius input could not be converted to float.")
+            radius_miles = 0
+
+        # if Yelp came back empty (error or out of quota), fall back to
+        # restaurants we already know about near the user
+        if not results:
+            start = time.time()
+            results = find_known_restaurants(
+                user_lat, user_lng, radius_miles or DEFAULT_FALLBACK_RADIUS_MILES,
+                cuisine=user_input.get("cuisine")
+            )
+            print(f"[TIMER] Spatial index fallback found {len(results)} known restaurants in {(time.time() - start) * 1000:.2f} ms")
+
+        # stage 1: a straight-line distance is never longer than the driving
+        # distance, so anything already outside the radius can be dropped
+        # before we pay for routing
+        if radius_miles > 0:
+            before_count = len(results)
+            results = prefilter_by_straight_line(user_lat, user_lng, results, radius_miles)
+            print(f"[TIMER] Straight-line prefilter kept {len(results)} of {before_count} restaurants for routing")
+
+        start = time.time()
+        results = await aio.call(calculate_distances_with_geoapify, user_lat, user_lng, results)
+        print(f"[TIMER] Distance calculation took {time.time() - start:.2f} seconds")
+
+        # stage 2: filter the survivors by driving distance
+        if radius_miles > 0:
+            before_count = len(results)
+            results = filter_by_radius(results, radius_miles, origin=(user_lat, user_lng))
+            print(f"[TIMER] Filtered from {before_count} to {len(results)} restaurants within {radius_miles} miles")
 
 
     if results:
         filtered_results = [r for r in results if r["rating"] > 3.5]
         if not filtered_results:
-            return []
-        num_recs = min(3, len(filtered_results))
+            return [], None
+        num_recs = min(RECOMMENDATION_COUNT, len(filtered_results))
         top_recs = random.sample(filtered_results, k=num_recs)
 
-        start = time.time()
-        #blurbs = generate_blurbs(top_recs, user_input)
-        blurbs = ["Blurb feature disabled for now.", "Blurb feature disabled for now.", "Blurb feature disabled for now."]
-        print(f"[TIMER] GenAI API took {time.time() - start:.2f} seconds")
-
-        for biz, blurb in zip(top_recs, blurbs):
-            biz["blurb"] = blurb
-            biz["user_location"] = user_input["location"]
-            biz["cuisine"] = user_input["cuisine"]
-            biz["vibe"] = user_input["vibe"]
-            biz["user_id"] = user_id
-            biz["image_url"] = biz.get("image_url", "")
-            if 'distance_meters' not in biz:
-                biz['distance_meters'] = None
-            if 'driving_distance_miles' not in biz:
-                biz['driving_distance_miles'] = None
-            if 'driving_duration_minutes' not in biz:
-                biz['driving_duration_minutes'] = None
-            
-            if 'coordinates' in biz:
-                del biz['coordinates']
-
-        # check if any of these restaurants are already loved
-        with engine.connect() as connection:
-            for restaurant in top_recs:
-                loved_check = connection.execute(
-                    db.text(f"""
-                        SELECT loved FROM {TABLE_RN} 
-                        WHERE user_id = :uid AND name = :name AND location = :location
-                    """),
-                    {"uid": user_id, "name": restaurant["name"], "location": restaurant["location"]}
-                ).fetchone()
-                
-                # set loved status based on database
-                if loved_check:
-                    restaurant["loved"] = bool(loved_check[0])
-                else:
-                    restaurant["loved"] = False
-
-        save_to_db(top_recs, user_id)
-        return top_recs
+        # keep the rest of the candidates so the user can reroll without
+        # another Yelp/Geoapify round trip
+        pool_id = save_candidate_pool(user_input, user_id, filtered_results, top_recs)
+
+        return await finalize_recommendations_async(top_recs, user_input, user_id), pool_id
 
     else:
-        return []
+        return [], None
 
 
-def migrate_database():
-    """Add missing distance columns to existing table"""
-    with engine.connect() as connection:
-        # check if columns exist and add them if they don't
-        try:
-            # try to select the new columns to see if they exist
-            connection.execute(db.text(f"SELECT distance_meters FROM {TABLE_RN} LIMIT 1"))
-            print("Distance columns already exist")
-        except Exception:
-            print("Adding missing distance columns...")
-            try:
-                connection.execute(db.text(f"ALTER TABLE {TABLE_RN} ADD COLUMN distance_meters REAL"))
-                connection.execute(db.text(f"ALTER TABLE {TABLE_RN} ADD COLUMN driving_distance_miles REAL"))
-                connection.execute(db.text(f"ALTER TABLE {TABLE_RN} ADD COLUMN driving_duration_minutes REAL"))
-                connection.commit()
-                print("Distance columns added successfully!")
-            except Exception as e:
-                print(f"Error adding columns: {e}")
-
-        # check if loved column exists and add it if it doesn't
-        try:
-            connection.execute(db.text(f"SELECT loved FROM {TABLE_RN} LIMIT 1"))
-            print("Loved column already exists")
-        except Exception:
-            print("Adding missing loved column...")
-            try:
-                connection.execute(db.text(f"ALTER TABLE {TABLE_RN} ADD COLUMN loved BOOLEAN DEFAULT FALSE"))
-                connection.commit()
-                print("Loved column added successfully!")
-            except Exception as e:
-                print(f"Error adding loved column: {e}")
+def run_restaurant_search(user_input, user_id):
+    recommendations, _ = search_restaurants_with_pool(user_input, user_id)
+    return recommendations
 
-        try:
-            connection.execute(db.text(f"SELECT notes FROM {TABLE_RN} LIMIT 1"))
-            print("Notes column already exists")
-        except Exception:
-            print("Adding missing notes column...")
-            try:
-                connection.execute(db.text(f"ALTER TABLE {TABLE_RN} ADD COLUMN notes TEXT DEFAULT ''"))
-                connection.commit()
-                print("Notes column added successfully!")
-            except Exception as e:
-                print(f"Error adding notes column: {e}")
+
+def finalize_recommendations(top_recs, user_input, user_id):
+    return aio.run_sync(finalize_recommendations_async(top_recs, user_input, user_id))
+
+
+async def finalize_recommendations_async(top_recs, user_input, user_id):
+    """Fill in the display/DB fields, look up saved/loved status and save the picks"""
+    start = time.time()
+    # blurbs (GenAI) and the status lookup (one DB query) are independent, so run them together
+    blurbs, statuses = await asyncio.gather(
+        aio.call(_restaurant_blurbs, top_recs, user_input),
+        aio.call(restaurant_status, top_recs, user_id),
+    )
+    print(f"[TIMER] GenAI + loved lookup took {time.time() - start:.2f} seconds")
+
+    for biz, blurb, status in zip(top_recs, blurbs, statuses):
+        biz["blurb"] = blurb
+        biz.update(status)
+        biz["user_location"] = user_input["location"]
+        biz["cuisine"] = user_input["cuisine"]
+        biz["vibe"] = user_input["vibe"]
+        biz["user_id"] = user_id
+        biz["image_url"] = biz.get("image_url", "")
+        if 'distance_meters' not in biz:
+            biz['distance_meters'] = None
+        if 'driving_distance_miles' not in biz:
+            biz['driving_distance_miles'] = None
+        if 'driving_duration_minutes' not in biz:
+            biz['driving_duration_minutes'] = None
+        
+        # keep the position as flat columns so the spatial index can use it
+        coords = biz.pop('coordinates', None) or {}
+        biz['latitude'] = coords.get('latitude')
+        biz['longitude'] = coords.get('longitude')
+
+    await aio.call(save_to_db, top_recs, user_id)
+    return top_recs
+
+
+def _restaurant_blurbs(top_recs, user_input):
+    #return generate_blurbs(top_recs, user_input)
+    return ["Blurb feature disabled for now."] * len(top_recs)
+
+
+def _candidate_key(restaurant):
+    return f"{restaurant['name']}|{restaurant['location']}"
+
+
+def save_candidate_pool(user_input, user_id, candidates, shown):
+    """Store the filtered candidates of one search and return the pool id"""
+    pool_id = uuid.uuid4().hex
+    candidate_pool_cache.set(pool_id, {
+        "user_id": user_id,
+        "user_input": user_input,
+        "candidates": candidates,
+        "shown": [_candidate_key(r) for r in shown],
+    })
+    return pool_id
+
+
+def reroll_recommendations(pool_id, user_id):
+    """
+    Draw a fresh set of picks from a cached candidate pool without calling
+    Yelp or Geoapify. Candidates already shown are skipped until the pool runs
+    out, then it starts over. Returns None if the pool expired or belongs to
+    another user.
+    """
+    pool = candidate_pool_cache.get(pool_id) if pool_id else None
+    if pool is None or pool["user_id"] != user_id:
+        return None
+
+    shown = set(pool["shown"])
+    remaining = [r for r in pool["candidates"] if _candidate_key(r) not in shown]
+    if not remaining:
+        # everything has been shown once; start over
+        shown = set()
+        remaining = pool["candidates"]
+
+    picks = random.sample(remaining, k=min(RECOMMENDATION_COUNT, len(remaining)))
+    pool["shown"] = sorted(shown | {_candidate_key(r) for r in picks})
+    candidate_pool_cache.set(pool_id, pool)
+
+    return finalize_recommendations(picks, pool["user_input"], user_id)
+
+
+def migrate_database():
+    """Bring the schema up to date; kept for callers from before shared.migrations"""
+    run_migrations()
 
 
 def update_restaurant_notes(user_id, restaurant_name, restaurant_location, notes):
     """Update the notes for a specific restaurant"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         connection.execute(
             db.text(f"""
@@ -667,7 +989,6 @@ def update_restaurant_notes(user_id, restaurant_name, restaurant_location, notes
 
 def get_restaurant_notes(user_id, restaurant_name, restaurant_location):
     """Get the current notes for a specific restaurant"""
-    create_foodiesrn_table()
     with engine.connect() as connection:
         result = connection.execute(
             db.text(f"""
@@ -0,0 +1,109 @@
+# In-memory spatial index over restaurants we have already shown to users
+# Restaurants are bucketed into a lat/lng grid so radius queries only look at nearby cells
+import math
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from FoodiesRN.distance import haversine_distances, METERS_PER_MILE
+
+# one degree of latitude is ~69 miles everywhere
+MILES_PER_DEGREE_LAT = 69.0
+
+
+class RestaurantIndex:
+    """
+    Grid-bucket index of known restaurants for "within R miles of (lat, lng)"
+    queries. Restaurants are deduplicated by (name, location), so the same
+    place saved by many users is stored once. Safe to share across request
+    threads.
+    """
+
+    def __init__(self, cell_degrees=0.05):
+        self.cell_degrees = cell_degrees
+        self._buckets = defaultdict(dict)  # (row, col) -> {(name, location): restaurant}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def _cell(self, lat, lng):
+        return (math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees))
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(bucket) for bucket in self._buckets.values())
+
+    def add(self, restaurant):
+        """
+        Add or refresh one restaurant. Expects flat `latitude`/`longitude` keys
+        (as stored in the DB) or Yelp-style `coordinates`; anything without a
+        position is ignored.
+        """
+        coords = restaurant.get('coordinates') or {}
+        lat = restaurant.get('latitude', coords.get('latitude'))
+        lng = restaurant.get('longitude', coords.get('longitude'))
+        if lat is None or lng is None:
+            return
+
+        entry = {
+            "name": restaurant["name"],
+            "rating": restaurant.get("rating"),
+            "price": restaurant.get("price"),
+            "location": restaurant.get("location"),
+            "url": restaurant.get("url"),
+            "image_url": restaurant.get("image_url", ""),
+            "cuisine": restaurant.get("cuisine"),
+            "coordinates": {"latitude": float(lat), "longitude": float(lng)},
+            "yelp_id": restaurant.get("yelp_id"),
+        }
+        with self._lock:
+            self._buckets[self._cell(float(lat), float(lng))][(entry["name"], entry["location"])] = entry
+
+    def add_many(self, restaurants):
+        for restaurant in restaurants:
+            self.add(restaurant)
+
+    def query(self, lat, lng, radius_miles, cuisine=None, limit=None):
+        """
+        Return restaurants within `radius_miles` of (lat, lng), nearest first,
+        optionally limited to one cuisine. Each result is a copy with its
+        straight-line `distance_meters` filled in.
+        """
+        lat_span = radius_miles / MILES_PER_DEGREE_LAT
+        # longitude degrees shrink towards the poles
+        lng_span = lat_span / max(math.cos(math.radians(lat)), 0.01)
+        row_min, col_min = self._cell(lat - lat_span, lng - lng_span)
+        row_max, col_max = self._cell(lat + lat_span, lng + lng_span)
+
+        wanted = cuisine.casefold() if cuisine else None
+        candidates = []
+        with self._lock:
+            for row in range(row_min, row_max + 1):
+                for col in range(col_min, col_max + 1):
+                    bucket = self._buckets.get((row, col))
+                    if not bucket:
+                        continue
+                    for entry in bucket.values():
+                        if wanted and (entry.get("cuisine") or "").casefold() != wanted:
+                            continue
+                        candidates.append(entry)
+
+        if not candidates:
+            return []
+
+        meters, _ = haversine_distances(
+            lat, lng,
+            [c["coordinates"]["latitude"] for c in candidates],
+            [c["coordinates"]["longitude"] for c in candidates],
+        )
+        order = np.argsort(meters)
+        results = []
+        for i in order:
+            if meters[i] > radius_miles * METERS_PER_MILE:
+                break
+            match = dict(candidates[i], coordinates=dict(candidates[i]["coordinates"]))
+            match["distance_meters"] = float(meters[i])
+            results.append(match)
+            if limit and len(results) >= limit:
+                break
+        return results
@@ -1,7 +1,7 @@
 # Main Flask application for PrepRN
 
 from flask import Flask, render_template, request, redirect, url_for, session, flash
-from shared.auth import create_user_table, get_user_id
+from shared.auth import get_user_id
 from FoodiesRN.run_foodiesrn import *
 from forms import LoginForm, SignupForm
 from shared.auth import login
@@ -9,7 +9,7 @@ from prepngo.PrepnGo import main as run_prepngo_meals
 from prepngo.prepngo_helpers import *
 from dotenv import load_dotenv
 import time
-from FoodiesRN.run_foodiesrn import create_foodiesrn_table
+from shared.migrations import run_migrations
 import urllib.parse
 from prepngo.database_functions import init_db
 from flask import jsonify
@@ -27,6 +27,7 @@ from shared.profile  import (
 )
 from shared.activity import get_recent_liked_restaurants
 from prepngo.prepngo_helpers import get_loved_meals
+from genai_utils import warm_up_genai
 # Load environment variables
 load_dotenv()
 
@@ -40,11 +41,14 @@ params = {
     "apiKey": api_key
 }
 
-# Create user table if it doesn't already exist
-create_user_table()
-create_foodiesrn_table()
-migrate_database()
-init_pantry_db()
+# Create or upgrade every table once, before serving any request
+run_migrations()
+
+# Build the Gemini model handles in the background so the first request doesn't wait on them
+warm_up_genai([
+    (os.getenv("GOOGLE_API_KEY"), "gemini-1.5-flash"),
+    (os.getenv("GENAI_KEY"), "gemini-1.5-flash"),
+])
 
 # Home route redirects to login page
 @app.route("/")
@@ -156,10 +160,12 @@ def my_recommendations():
     
     user_id = session["user_id"]
     session.pop('foodies_results', None)
+    session.pop('foodies_pool_id', None)
     foodiesrn_results = view_saved_recommendations(user_id)
-    loved_restaurants = get_loved_restaurants(user_id)  
-    prepngo_results = get_saved_prepngo(session["user_id"])
-    loved_meals = get_loved_meals(session["user_id"])
+    prepngo_results = get_saved_prepngo(user_id)
+    # the liked tabs are the loved rows of the lists above, no need to query again
+    loved_restaurants = [r for r in foodiesrn_results if r.loved]
+    loved_meals = [m for m in prepngo_results if m["loved"]]
     return render_template("my_recommendations.html",
                            foodiesrn_results=foodiesrn_results,
                            loved_restaurants=loved_restaurants,
@@ -267,18 +273,12 @@ def foodies():
             return render_template("foodies.html", results=None, error_msg="Please enter a location or use GPS.")
 
         try:
-            results = run_restaurant_search(user_input, session["user_id"])
-            
-            # Add Google Maps URLs to each result
-            for restaurant in results:
-                maps_query = f"{restaurant['name']} {restaurant['location']}"
-                restaurant['maps_url'] = f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(maps_query)}"
-                restaurant['detail_url'] = url_for('restaurant_detail', 
-                                                 restaurant_name=restaurant['name'], 
-                                                 restaurant_location=restaurant['location'])
+            results, pool_id = search_restaurants_with_pool(user_input, session["user_id"])
+            add_restaurant_links(results)
             
             # Store results in session and redirect to GET request
             session['foodies_results'] = results
+            session['foodies_pool_id'] = pool_id
             return redirect(url_for('foodies'))
             
         except Exception as e:
@@ -288,7 +288,35 @@ def foodies():
 
     # GET request - show form or stored results
     results = session.get('foodies_results')
-    return render_template("foodies.html", results=results, error_msg=None)
+    return render_template("foodies.html", results=results, error_msg=None,
+                           can_reroll=bool(results and session.get('foodies_pool_id')))
+
+
+# Add Google Maps and detail page URLs to each restaurant result
+def add_restaurant_links(results):
+    for restaurant in results:
+        maps_query = f"{restaurant['name']} {restaurant['location']}"
+        restaurant['maps_url'] = f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(maps_query)}"
+        restaurant['detail_url'] = url_for('restaurant_detail', 
+                                         restaurant_name=restaurant['name'], 
+                                         restaurant_location=restaurant['location'])
+    return results
+
+
+# Reroll route: alternate picks from the last search's cached candidates
+@app.route("/foodies/reroll", methods=["POST"])
+def reroll_foodies():
+    if "user_id" not in session:
+        return redirect(url_for("login_view"))
+
+    results = reroll_recommendations(session.get('foodies_pool_id'), session["user_id"])
+    if results is None:
+        session.pop('foodies_pool_id', None)
+        return render_template("foodies.html", results=None,
+                               error_msg="Those results have expired. Please search again.")
+
+    session['foodies_results'] = add_restaurant_links(results)
+    return redirect(url_for('foodies'))
 
 
 # Clear search results route
@@ -298,6 +326,7 @@ def clear_foodies_search():
         return redirect(url_for("login_view"))
     
     session.pop('foodies_results', None)
+    session.pop('foodies_pool_id', None)
     return redirect(url_for('foodies'))
 
 
@@ -314,6 +343,7 @@ def prep():
     # —— If the URL has ?clear=1, force‐clear old results —— 
     if request.method == "GET" and request.args.get("clear"):
         session.pop("prep_results", None)
+        session.pop("prep_input", None)
 
     # —— POST: handle form submission —— 
     if request.method == "POST":
@@ -372,6 +402,8 @@ def prep():
 
         save_prepngo_results(results["meals"], user_input, user_id)
         session["prep_results"] = results
+        # kept so later pages are saved against the same preferences
+        session["prep_input"] = user_input
 
         # redirect to GET (without clearing!) so spinner + scroll work
         return redirect(url_for("prep"))
@@ -386,6 +418,31 @@ def prep():
     )
 
 
+# "More meals" route: next page from the meal pool of the last /prep search
+@app.route("/prep/more", methods=["POST"])
+def prep_more():
+    if "user_id" not in session:
+        return redirect(url_for("login_view"))
+
+    user_id = session["user_id"]
+    previous = session.get("prep_results") or {}
+    start = time.time()
+    try:
+        results = get_more_prepngo_meals(previous.get("pool_id"), user_id)
+    except Exception as e:
+        print("[ERROR] PrepNGo more meals failed:", e)
+        flash("Something went wrong generating your meal plan.")
+        return redirect(url_for("prep"))
+    if results is None:
+        flash("No more meals for this search. Try a new one!")
+        return redirect(url_for("prep"))
+
+    results["duration"] = f"{time.time() - start:.2f}"
+    save_prepngo_results(results["meals"], session.get("prep_input") or {}, user_id)
+    session["prep_results"] = results
+    return redirect(url_for("prep"))
+
+
 # Logout route: clears session data
 @app.route("/logout")
 def logout():
@@ -1,12 +1,160 @@
 # Import the Gemini AI client and os for environment variables
 import google.generativeai as genai
+import json
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from shared.cache import TTLCache
+from shared.circuit import breaker_from_env
+
+# Upper bound on a single model call, so a hung request can't hold a worker forever
+GENAI_REQUEST_TIMEOUT = float(os.getenv("GENAI_REQUEST_TIMEOUT", 10))
+
+# How long a page waits for GenAI text before using its template fallback
+GENAI_DEADLINE = float(os.getenv("GENAI_DEADLINE", 2))
+
+# Gemini circuit breaker: after a run of failed or slow calls, GenAI is skipped
+# for a while and every caller goes straight to its template fallback. A call
+# slower than the callers' deadline is of no use to them, so it counts as failed.
+genai_breaker = breaker_from_env("genai", slow_call_seconds=GENAI_DEADLINE)
+
+# Generated descriptions and blurbs, reused across users until the prompt changes
+GENAI_TEXT_CACHE_TTL = int(os.getenv("GENAI_TEXT_CACHE_TTL", 30 * 24 * 60 * 60))
+GENAI_TEXT_CACHE_MAX_ROWS = int(os.getenv("GENAI_TEXT_CACHE_MAX_ROWS", 20000))
+genai_text_cache = TTLCache(
+    "genai_text_cache",
+    ttl_seconds=GENAI_TEXT_CACHE_TTL,
+    memory_size=1024,
+    max_rows=GENAI_TEXT_CACHE_MAX_ROWS,
+)
+
+
+def text_cache_key(prompt_version: str, *parts: str) -> str:
+    """
+    Key for genai_text_cache. Bump `prompt_version` whenever a prompt changes
+    so old text is no longer served; `parts` are case and whitespace normalized.
+    """
+    normalized = [" ".join(str(p or "").split()).casefold() for p in parts]
+    return "|".join([prompt_version] + normalized)
+
+
+# Model handles are built once per (api key, model name) and shared by all
+# request threads. The SDK holds one process-wide API key (genai.configure) and
+# a handle picks up the client for it on first use, so every cached handle
+# belongs to the configured key; asking for another key reconfigures the SDK
+# and rebuilds the handles.
+_model_registry: Dict[Tuple[Optional[str], str], Any] = {}
+_registry_lock = threading.Lock()
+_configured_key: Optional[str] = None
 
 
 # Function to initialize and return a Gemini generative model
 def get_genai_model(api_key: str, model_name: str = "gemini-1.5-flash"):
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel(model_name)
+    global _configured_key
+    key = (api_key, model_name)
+    model = _model_registry.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        model = _model_registry.get(key)
+        if model is None:
+            if api_key != _configured_key:
+                genai.configure(api_key=api_key)
+                _configured_key = api_key
+                _model_registry.clear()
+            model = genai.GenerativeModel(model_name)
+            _model_registry[key] = model
+    return model
+
+
+def warm_up_genai(models: Sequence[Tuple[Optional[str], str]], ping: bool = True) -> Optional[threading.Thread]:
+    """
+    Build model handles (and their gRPC channels) in a background thread at app
+    start so the first user request doesn't pay the setup cost. With `ping`, a
+    count_tokens call also opens the connection; it spends no generation quota.
+    Entries without an API key are skipped.
+    """
+    models = [(api_key, name) for api_key, name in models if api_key]
+    if not models or os.getenv("GENAI_WARMUP", "1") == "0":
+        return None
+
+    def warm_up():
+        for api_key, model_name in models:
+            try:
+                model = get_genai_model(api_key, model_name)
+                if ping:
+                    model.count_tokens("ping", request_options={"timeout": GENAI_REQUEST_TIMEOUT})
+                print(f"[DEBUG] GenAI model {model_name} warmed up")
+            except Exception as e:
+                print(f"[DEBUG] GenAI warm-up failed for {model_name}: {e}")
+
+    thread = threading.Thread(target=warm_up, name="genai-warmup", daemon=True)
+    thread.start()
+    return thread
+
+# Ask the model for one JSON object per item so batched answers can be mapped back by index
+JSON_LIST_INSTRUCTIONS = (
+    'Respond with only a JSON array containing one object per item, in the form '
+    '[{"index": 1, "text": "..."}, {"index": 2, "text": "..."}]. '
+    'Use the item numbers given below as "index".'
+)
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+
+def parse_indexed_json(text: str, count: int) -> List[Optional[str]]:
+    """
+    Parse a batched model answer of the form [{"index": 1, "text": "..."}, ...]
+    into a list of `count` strings, where slot i holds the text for item i + 1.
+    A bare list of strings is accepted too. Missing, duplicate, out-of-range or
+    empty entries come back as None so callers can fall back per item.
+    """
+    results: List[Optional[str]] = [None] * count
+    if not text:
+        return results
+
+    cleaned = text.strip()
+    # tolerate ```json fences even though we ask for raw JSON
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        if cleaned.lower().startswith("json"):
+            cleaned = cleaned[4:]
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        print("[DEBUG] GenAI batch response was not valid JSON")
+        return results
+    if not isinstance(data, list):
+        return results
+
+    for position, entry in enumerate(data):
+        if isinstance(entry, str):
+            index, value = position, entry
+        elif isinstance(entry, dict):
+            try:
+                index = int(entry.get("index")) - 1
+            except (TypeError, ValueError):
+                continue
+            value = entry.get("text")
+        else:
+            continue
+
+        if 0 <= index < count and results[index] is None and isinstance(value, str) and value.strip():
+            results[index] = value.strip()
+    return results
+
+
+def genai_generate(model, prompt, **kwargs):
+    """
+    model.generate_content through the Gemini circuit breaker, with the
+    default request timeout. Raises CircuitOpenError while the breaker is open.
+    """
+    kwargs.setdefault("request_options", {"timeout": GENAI_REQUEST_TIMEOUT})
+    return genai_breaker.call(model.generate_content, prompt, **kwargs)
+
 
 # Function to generate a short meal description using Gemini AI
 def get_summary(title: str, model=None) -> str:
@@ -16,9 +164,125 @@ def get_summary(title: str, model=None) -> str:
             # If no model is passed, load API key from env and get the default model
             api_key = os.getenv("GOOGLE_API_KEY")
             model = get_genai_model(api_key, "gemini-1.5-flash")
-        response = model.generate_content(prompt)
+        response = genai_generate(model, prompt)
         return response.text.strip()
     except Exception as e:
         # Print error and return a fallback description
         print("Gemini error:", e)
         return "A delicious and healthy choice!"
+
+
+
+# Fixed-size worker pool shared by every GenAI call in the process
+class GenAIExecutor:
+    """
+    Runs GenAI calls on a fixed set of worker threads fed by a bounded queue.
+
+    When the queue is full, new work is rejected immediately instead of piling
+    up, and callers use their template fallback. A slow model endpoint
+    therefore never grows the thread count or the backlog past
+    `workers + queue_size`.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 32, name: str = "genai"):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[Future, Callable, tuple, dict]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _start_workers(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self) -> None:
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            try:
+                # skip work whose caller already gave up on it
+                if not future.set_running_or_notify_cancel():
+                    continue
+                with self._lock:
+                    self.in_flight += 1
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                    with self._lock:
+                        self.completed += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    with self._lock:
+                        self.failed += 1
+                finally:
+                    with self._lock:
+                        self.in_flight -= 1
+            finally:
+                self._queue.task_done()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """Queue `fn(*args, **kwargs)`. Returns None if the queue is full (load shed)."""
+        self._start_workers()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((future, fn, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return None
+        return future
+
+    def run_batch(self, calls: Sequence[Tuple[Callable, tuple]], timeout: float) -> List[Optional[Any]]:
+        """
+        Run several calls under one overall deadline. Each slot in the result
+        is the call's return value, or None if it was shed, failed or missed
+        the deadline.
+        """
+        futures = [self.submit(fn, *args) for fn, args in calls]
+        deadline = time.monotonic() + timeout
+
+        results: List[Optional[Any]] = []
+        for future in futures:
+            if future is None:
+                results.append(None)
+                continue
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except Exception:
+                if not future.done():
+                    # drop it from the queue if it never started
+                    future.cancel()
+                    with self._lock:
+                        self.timeouts += 1
+                results.append(None)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth, in-flight count and outcome counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+genai_executor = GenAIExecutor(
+    workers=int(os.getenv("GENAI_WORKERS", 4)),
+    queue_size=int(os.getenv("GENAI_QUEUE_SIZE", 32)),
+)
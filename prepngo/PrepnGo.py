@@ -1,25 +1,70 @@
 # Meal Prep Shopping List Automator (Hybrid GenAI + Templates)
 # Prompts user for meal budget, # of people cooking for & dietary restrictions
-# Uses Spoonacular API to generate 3 meal prep ideas
+# Uses Spoonacular API to generate 3 meal prep ideas (from a larger pool that "more meals" pages through)
 # Uses GenAI with timeouts for descriptions and store suggestions, falls back to templates
 # Saves to SQLite DB
+import asyncio
 import os
 import random
-import time
-import threading
+import uuid
 from typing import List, Dict, Optional
-from prepngo.spoonacular_utils import get_random_meal_plan, find_by_ingredients, get_recipe_information
-from genai_utils import get_genai_model
+from prepngo.spoonacular_utils import (
+    get_random_meal_plan,
+    find_by_ingredients,
+    get_recipe_information_many,
+    spoonacular,
+    spoon_limiter,
+)
+from shared.cache import TTLCache
+from shared import aio
+from genai_utils import (
+    get_genai_model,
+    genai_generate,
+    genai_breaker,
+    genai_executor,
+    GENAI_DEADLINE,
+    genai_text_cache,
+    text_cache_key,
+    parse_indexed_json,
+    JSON_LIST_INSTRUCTIONS,
+    JSON_GENERATION_CONFIG,
+)
 from google.api_core.exceptions import ResourceExhausted
 
 # Your API Keys
 SPOON_API_KEY = os.getenv('SPOON_API_KEY')
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# Describe all meals in one prompt (set to 0 to send one prompt per meal)
+GENAI_BATCH_DESCRIPTIONS = os.getenv("GENAI_BATCH_DESCRIPTIONS", "1") != "0"
+
+# Bump when the description prompts change so cached text is regenerated
+DESCRIPTION_PROMPT_VERSION = "meal-description-v1"
+
+# Meals are shown PREP_PAGE_SIZE at a time. One Spoonacular request fetches a
+# pool of PREP_POOL_SIZE; the unseen rest waits in meal_pool_cache so "more
+# meals" needs no new search.
+PREP_PAGE_SIZE = int(os.getenv("PREP_PAGE_SIZE", 3))
+PREP_POOL_SIZE = int(os.getenv("PREP_POOL_SIZE", 12))
+PREP_POOL_TTL = int(os.getenv("PREP_POOL_TTL", 30 * 60))
+
 if not SPOON_API_KEY:
     print(" ERROR: SPOON_API_KEY not set. Export your Spoonacular key first.")
     exit(1)
 
+# shown instead of meals when Spoonacular is down and nothing was cached
+SPOON_UNAVAILABLE_NOTICE = "Recipe search is temporarily unavailable. Please try again in a few minutes."
+# shown when today's Spoonacular quota ran out before every meal was loaded
+SPOON_QUOTA_NOTICE = "We've reached today's recipe lookup limit, so some meals couldn't be loaded. Please try again tomorrow."
+
+# built after the key check so a missing key exits before anything is set up
+meal_pool_cache = TTLCache(
+    "prepngo_meal_pool",
+    ttl_seconds=PREP_POOL_TTL,
+    memory_size=256,
+    max_rows=int(os.getenv("PREP_POOL_MAX_ROWS", 2000)),
+)
+
 # Template descriptions for meals for fallback
 MEAL_DESCRIPTIONS = [
     "A delicious and nutritious meal that's perfect for any time of day. This recipe combines fresh ingredients with time-tested cooking techniques to create something truly memorable that will satisfy both your hunger and your craving for great flavors.",
@@ -58,42 +103,196 @@ def get_random_description():
     """Return a random description from our template list."""
     return random.choice(MEAL_DESCRIPTIONS)
 
-def _generate_genai_description_with_timeout(meal_title: str, timeout: float = 2.0) -> Optional[str]:
+def _description_cache_key(meal_title: str) -> str:
+    return text_cache_key(DESCRIPTION_PROMPT_VERSION, meal_title)
+
+def _genai_describe(meal_title: str) -> Optional[str]:
+    """Ask GenAI for a short description of one meal. Returns None on failure."""
+    try:
+        model = get_genai_model(GOOGLE_API_KEY)
+        prompt = f"Write a short, appetizing description (2-3 sentences) for this meal: {meal_title}. Focus on taste, preparation style, and appeal."
+
+        response = genai_generate(model, prompt)
+        if response and response.text:
+            description = response.text.strip()
+            # cached from the worker, so answers that miss the deadline still help the next request
+            genai_text_cache.set(_description_cache_key(meal_title), description)
+            return description
+    except Exception as e:
+        print(f"[DEBUG] GenAI description failed for '{meal_title}': {e}")
+    return None
+
+def _genai_describe_batch(meal_titles: List[str]) -> List[Optional[str]]:
+    """
+    Ask GenAI for descriptions of several meals in a single prompt.
+    Returns one entry per title, with None wherever the answer had a gap.
+    """
+    try:
+        model = get_genai_model(GOOGLE_API_KEY)
+        prompt = (
+            "Write a short, appetizing description (2-3 sentences) for each meal below. "
+            "Focus on taste, preparation style, and appeal.\n"
+            f"{JSON_LIST_INSTRUCTIONS}\n\n"
+        )
+        for i, title in enumerate(meal_titles, 1):
+            prompt += f"{i}. {title}\n"
+
+        response = genai_generate(model, prompt, generation_config=JSON_GENERATION_CONFIG)
+        descriptions = parse_indexed_json(response.text if response else "", len(meal_titles))
+        for title, description in zip(meal_titles, descriptions):
+            if description:
+                genai_text_cache.set(_description_cache_key(title), description)
+        return descriptions
+    except Exception as e:
+        print(f"[DEBUG] GenAI batch description failed: {e}")
+        return [None] * len(meal_titles)
+
+def _generate_genai_descriptions(meal_titles: List[str], timeout: float = GENAI_DEADLINE) -> List[Optional[str]]:
+    """
+    Generate descriptions for a batch of meals concurrently.
+    `timeout` is one deadline for the whole batch, not per meal: anything still
+    running when it passes comes back as None so the caller can fall back.
+    """
+    # Previously generated descriptions are served straight from the text cache
+    results = [genai_text_cache.get(_description_cache_key(title)) for title in meal_titles]
+    uncached = [i for i, r in enumerate(results) if r is None]
+    if len(uncached) < len(meal_titles):
+        print(f"[DEBUG] GenAI text cache hit for {len(meal_titles) - len(uncached)}/{len(meal_titles)} meals")
+    if not GOOGLE_API_KEY or not uncached:
+        return results
+    if not genai_breaker.available():
+        # Gemini has been failing or slow; don't spend the deadline on it
+        print(f"[DEBUG] GenAI circuit open, using fallback for {len(uncached)}/{len(meal_titles)} meals")
+        return results
+
+    titles = [meal_titles[i] for i in uncached]
+    if GENAI_BATCH_DESCRIPTIONS and len(titles) > 1:
+        # one round trip for the whole batch; gaps fall back per meal
+        generated = genai_executor.run_batch([(_genai_describe_batch, (titles,))], timeout=timeout)[0]
+        generated = generated or [None] * len(titles)
+    else:
+        generated = genai_executor.run_batch([(_genai_describe, (title,)) for title in titles], timeout=timeout)
+    for i, description in zip(uncached, generated):
+        results[i] = description
+
+    missing = sum(1 for r in results if r is None)
+    if missing:
+        print(f"[DEBUG] GenAI description missing for {missing}/{len(results)} meals, using fallback. Executor: {genai_executor.stats()}")
+
+    return results
+
+def _generate_genai_description_with_timeout(meal_title: str, timeout: float = GENAI_DEADLINE) -> Optional[str]:
     """
     Try to generate a meal description using GenAI with a timeout.
     Returns None if timeout is exceeded or if GenAI fails.
     """
-    if not GOOGLE_API_KEY:
-        return None
-    
-    result = [None]  # Use list to allow modification from inner function
-    exception_occurred = [False]
-    
-    def genai_task():
-        try:
-            model = get_genai_model(GOOGLE_API_KEY)
-            prompt = f"Write a short, appetizing description (2-3 sentences) for this meal: {meal_title}. Focus on taste, preparation style, and appeal."
-            
-            response = model.generate_content(prompt)
-            if response and response.text:
-                result[0] = response.text.strip()
-        except Exception as e:
-            print(f"[DEBUG] GenAI description failed for '{meal_title}': {e}")
-            exception_occurred[0] = True
-    
-    # Start the GenAI task in a separate thread
-    thread = threading.Thread(target=genai_task)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout=timeout)
-    
-    if thread.is_alive():
-        print(f"[DEBUG] GenAI description timeout ({timeout}s) for '{meal_title}', using fallback")
-        return None
-    elif exception_occurred[0]:
-        return None
+    return _generate_genai_descriptions([meal_title], timeout=timeout)[0]
+
+def _describe_meals(meals: List[Dict], timeout: float = GENAI_DEADLINE) -> None:
+    """
+    Fill in `summary` for every meal, using GenAI where it answers before the
+    deadline and a template description otherwise. `summary_source` records
+    which one each meal got ("ai" or "template").
+    """
+    descriptions = _generate_genai_descriptions([m.get("title", "") for m in meals], timeout=timeout)
+    _apply_descriptions(meals, descriptions)
+
+def _apply_descriptions(meals: List[Dict], descriptions: List[Optional[str]]) -> None:
+    """Set `summary`/`summary_source` from generated descriptions, templates for gaps."""
+    for meal, description in zip(meals, descriptions):
+        if description:
+            meal["summary"] = description
+            meal["summary_source"] = "ai"
+        else:
+            meal["summary"] = get_random_description()
+            meal["summary_source"] = "template"
+
+    ai_count = sum(1 for m in meals if m["summary_source"] == "ai")
+    print(f"[DEBUG] GenAI descriptions: {ai_count}/{len(meals)} meals got AI text")
+
+def _prefetch_descriptions(meal_titles: List[str]) -> None:
+    """
+    Generate descriptions in the background for meals on later pages so they
+    are already in the text cache when the user asks for more.
+    """
+    if not GOOGLE_API_KEY or not genai_breaker.available():
+        return
+    titles = [t for t in meal_titles if genai_text_cache.get(_description_cache_key(t)) is None]
+    if not titles:
+        return
+    if GENAI_BATCH_DESCRIPTIONS and len(titles) > 1:
+        genai_executor.submit(_genai_describe_batch, titles)
+    else:
+        for title in titles:
+            genai_executor.submit(_genai_describe, title)
+
+def _pantry_meal(full_details: Dict, meal_type: str) -> Dict:
+    return {
+        "title": full_details.get("title", ""),
+        "summary": "",
+        "price": 0.0,
+        "diets": full_details.get("diets", []),
+        "source_url": full_details.get("sourceUrl", ""),
+        "meal_type": meal_type
+    }
+
+async def _take_page(pool: Dict) -> List[Dict]:
+    """
+    Pop the next page of meals off a pool. Grocery pools hold finished meal
+    dicts; pantry pools hold Spoonacular ids, and recipe details are fetched
+    only for the page being shown, so pages nobody asks for cost no quota.
+    """
+    entries = pool["entries"][:PREP_PAGE_SIZE]
+    pool["entries"] = pool["entries"][PREP_PAGE_SIZE:]
+
+    if pool["kind"] == "pantry":
+        # the titles are already known, so the descriptions (one shared
+        # GENAI_DEADLINE) are generated while the recipe details are fetched
+        all_details, descriptions = await asyncio.gather(
+            aio.call(get_recipe_information_many, [item["id"] for item in entries]),
+            aio.call(_generate_genai_descriptions, [item["title"] for item in entries], timeout=GENAI_DEADLINE),
+        )
+        meals, meal_descriptions = [], []
+        for details, description in zip(all_details, descriptions):
+            if details:
+                meals.append(_pantry_meal(details, pool["meal_type"]))
+                meal_descriptions.append(description)
+        if len(meals) < len(entries) and spoon_limiter.daily_quota_spent():
+            pool["notice"] = SPOON_QUOTA_NOTICE
+        _apply_descriptions(meals, meal_descriptions)
+    else:
+        meals = entries
+        await aio.call(_describe_meals, meals, timeout=GENAI_DEADLINE)
+
+    for meal in meals:
+        meal["meal_type"] = pool["meal_type"]
+    return meals
+
+def _page_result(pool: Dict, pool_id: str, meals: List[Dict]) -> Dict:
+    has_more = bool(pool["entries"])
+    if has_more:
+        meal_pool_cache.set(pool_id, pool)
     else:
-        return result[0]
+        meal_pool_cache.delete(pool_id)
+    return {
+        "meals": meals,
+        "stores": pool["stores"],
+        "pool_id": pool_id,
+        "has_more": has_more,
+        "notice": pool.get("notice"),
+    }
+
+def more_meals(pool_id: str, user_id: Optional[int]) -> Optional[dict]:
+    """
+    Next page of meals from the pool of an earlier search, in the same shape
+    main() returns. Returns None if the pool has expired, is used up, or
+    belongs to another user.
+    """
+    pool = meal_pool_cache.get(pool_id) if pool_id else None
+    if not pool or not pool["entries"] or pool.get("user_id") != user_id:
+        return None
+    meals = aio.run_sync(_take_page(pool))
+    return _page_result(pool, pool_id, meals)
 
 def _generate_store_suggestions_with_genai_timeout(city: str, state: str, budget: float, timeout: float = 3.0) -> str:
     """
@@ -170,7 +369,10 @@ def _generate_template_store_suggestions(city: str, state: str, budget: float) -
     
     return result.strip()
 
-def main(user_input: dict) -> dict:
+def main(user_input: dict, user_id: Optional[int] = None) -> dict:
+    return aio.run_sync(main_async(user_input, user_id))
+
+async def main_async(user_input: dict, user_id: Optional[int] = None) -> dict:
     budget = float(user_input["budget"]) if user_input["budget"] else 0.0
     servings = int(user_input["servings"])
     diets = user_input.get('diets', [])
@@ -189,53 +391,44 @@ def main(user_input: dict) -> dict:
     # If user doesn't want to go grocery shopping
     if grocery.lower() == "no":
         print("[DEBUG] Pantry ingredients:", pantry)
-        basic_meals = find_by_ingredients(pantry, number=5)
+        basic_meals = await aio.call(find_by_ingredients, pantry, number=PREP_POOL_SIZE)
         print("[DEBUG] Spoonacular returned:", basic_meals)
 
-        meals = []
-        for item in basic_meals:
-            try:
-                full_details = get_recipe_information(item['id'])
-                meal_title = full_details.get("title", "")
-                
-                # Try GenAI description with 2 second timeout, fallback to template
-                genai_description = _generate_genai_description_with_timeout(meal_title, timeout=2.0)
-                description = genai_description if genai_description else get_random_description()
-                
-                meal = {
-                    "title": meal_title,
-                    "summary": description,
-                    "price": 0.0,
-                    "diets": full_details.get("diets", []),
-                    "source_url": full_details.get("sourceUrl", ""),
-                    "meal_type": meal_type
-                }
-                meals.append(meal)
-                time.sleep(1.2)  # Prevent hitting rate limit (esp. on free tier)
-            except Exception as e:
-                print("[ERROR] Failed to fetch details for recipe:", item['id'], e)
-
-        return {
-            "meals": meals,
-            "stores": "No grocery stores needed. All meals use pantry ingredients!"
+        # Only the first page gets full recipe details now (concurrently, through
+        # the shared Spoonacular limiter); the rest are fetched as the user pages
+        pool = {
+            "kind": "pantry",
+            "user_id": user_id,
+            "meal_type": meal_type,
+            "stores": "No grocery stores needed. All meals use pantry ingredients!",
+            "entries": [{"id": item["id"], "title": item.get("title", "")} for item in basic_meals],
+        }
+    else:
+        # Otherwise, fetch random meal plan with grocery shopping. Store
+        # suggestions (GenAI with 3 second timeout, fallback to templates) don't
+        # depend on the meals, so they run alongside the Spoonacular search.
+        stores, entries = await asyncio.gather(
+            aio.call(_generate_store_suggestions_with_genai_timeout, city, state, budget, timeout=3.0),
+            aio.call(get_random_meal_plan, budget, servings, tags, number=PREP_POOL_SIZE),
+        )
+        pool = {
+            "kind": "grocery",
+            "user_id": user_id,
+            "meal_type": meal_type,
+            "stores": stores,
+            "entries": entries,
         }
 
-    # Otherwise, fetch random meal plan with grocery shopping
-    meals = get_random_meal_plan(budget, servings, tags)
-    
-    # Generate store suggestions with GenAI timeout (3 seconds), fallback to templates
-    stores = _generate_store_suggestions_with_genai_timeout(city, state, budget, timeout=3.0)
-    
-    # Add descriptions (GenAI with 2 second timeout) and meal_type to each meal
-    for meal in meals:
-        meal_title = meal.get('title', '')
-        
-        # Try GenAI description with 2 second timeout, fallback to template
-        genai_description = _generate_genai_description_with_timeout(meal_title, timeout=2.0)
-        meal['summary'] = genai_description if genai_description else get_random_description()
-        meal['meal_type'] = meal_type
+    if not pool["entries"]:
+        # degraded result: store suggestions only, with a note about the meals
+        if spoon_limiter.daily_quota_spent():
+            pool["notice"] = SPOON_QUOTA_NOTICE
+        elif not spoonacular.breaker.available():
+            pool["notice"] = SPOON_UNAVAILABLE_NOTICE
 
-    return {
-        "meals": meals,
-        "stores": stores
-    }
\ No newline at end of file
+    # Descriptions for later pages are generated in the background
+    _prefetch_descriptions([entry["title"] for entry in pool["entries"][PREP_PAGE_SIZE:]])
+
+    # Descriptions for the first page share one GENAI_DEADLINE
+    meals = await _take_page(pool)
+    return _page_result(pool, uuid.uuid4().hex, meals)
@@ -1,72 +1,16 @@
 import sqlite3
 from typing import List, Dict, Any
+from shared.db import raw_connection
+from shared.migrations import run_migrations
 
 def init_db(path: str) -> sqlite3.Connection:
-    """Initialize the SQLite database and tables if they don't exist."""
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    # Table to track user requests 
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            budget REAL NOT NULL,
-            servings INTEGER NOT NULL,
-            diets TEXT
-        )
-    ''')
-    # Table to store meals generated from a request
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS meals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            request_id INTEGER NOT NULL,
-            title TEXT,
-            price REAL,
-            diets TEXT,
-            summary TEXT,
-            source_url TEXT,
-            loved INTEGER DEFAULT 0,
-            FOREIGN KEY(request_id) REFERENCES requests(id)
-        )
-    ''')
-
-    add_loved_column_to_meals(conn)
-    add_meal_type_column_to_meals(conn)
-    
-    # Table to store meals generated from a request
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            request_id INTEGER NOT NULL,
-            satisfied BOOLEAN NOT NULL,
-            comments TEXT,
-            FOREIGN KEY(request_id) REFERENCES requests(id)
-        )
-    ''')
-    # Table to store Gemini-generated local store suggestions
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS local_stores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            request_id INTEGER NOT NULL,
-            city TEXT,
-            state TEXT,
-            suggestions TEXT,
-            FOREIGN KEY(request_id) REFERENCES requests(id)
-        )
-    ''')
-    conn.commit()
-    return conn
-
-
-def add_loved_column_to_meals(conn: sqlite3.Connection) -> None:
-    """Add loved column to meals table if it doesn't exist."""
-    cur = conn.cursor()
-    try:
-        cur.execute('ALTER TABLE meals ADD COLUMN loved INTEGER DEFAULT 0')
-        conn.commit()
-    except sqlite3.OperationalError:
-        # Column already exists
-        pass
+    """
+    Return a pooled connection to the database. The tables are created by
+    shared.migrations, which only does work the first time a process opens
+    `path`. close() returns the connection to the pool.
+    """
+    run_migrations(path)
+    return raw_connection(path)
 
 
 def toggle_meal_love_status(conn: sqlite3.Connection, user_id: int, meal_name: str, meal_url: str) -> bool:
@@ -180,9 +124,13 @@ def save_local_stores(
 
 
 # Retrieve all saved meals for a given user
-def get_saved_meals(conn: sqlite3.Connection, user_id: int) -> List[tuple]:
-    """Retrieve all saved meals for a user, joined with request metadata."""
+def get_saved_meals(conn: sqlite3.Connection, user_id: int) -> List[sqlite3.Row]:
+    """
+    Retrieve all saved meals for a user, joined with request metadata. Rows
+    index like tuples and can also be read by column name, e.g. row["loved"].
+    """
     cur = conn.cursor()
+    cur.row_factory = sqlite3.Row
     cur.execute('''
         SELECT meals.title, meals.price, meals.summary, meals.source_url, meals.loved, meals.meal_type
         FROM meals
@@ -193,17 +141,6 @@ def get_saved_meals(conn: sqlite3.Connection, user_id: int) -> List[tuple]:
     return cur.fetchall()
 
 
-def add_meal_type_column_to_meals(conn: sqlite3.Connection) -> None:
-    """Add meal_type column to meals table if it doesn't exist."""
-    cur = conn.cursor()
-    try:
-        cur.execute('ALTER TABLE meals ADD COLUMN meal_type TEXT DEFAULT ""')
-        conn.commit()
-    except sqlite3.OperationalError:
-        # Column already exists
-        pass
-
-
 def clear_loved_meals_db(conn: sqlite3.Connection, user_id: int) -> None:
     """Clear all loved meals for a user by setting loved = 0."""
     cur = conn.cursor()
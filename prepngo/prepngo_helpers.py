@@ -4,7 +4,7 @@ import sqlite3
 import json
 from sqlalchemy import text
 import re
-from prepngo.PrepnGo import main as run_prepngo_main
+from prepngo.PrepnGo import main as run_prepngo_main, more_meals as run_prepngo_more
 from prepngo.database_functions import (
     init_db,
     save_request,
@@ -15,7 +15,9 @@ from prepngo.database_functions import (
     toggle_meal_love_status,
     get_user_loved_meals,
 )
-from FoodiesRN.run_foodiesrn import engine
+from shared.db import engine, DB_PATH
+from shared.hydrate import hydrate_meals
+from shared.migrations import run_migrations
 import logging
 
 
@@ -29,8 +31,23 @@ def get_prepngo_meals(user_input, user_id):
     Runs your PrepnGo logic and returns basic recipe info only.
     Recipe ID fetching and detailed info is commented out for simplicity.
     """
-    results = run_prepngo_main(user_input)
+    results = run_prepngo_main(user_input, user_id)
+    return _prepare_meals_for_display(results, user_id)
+
+def get_more_prepngo_meals(pool_id, user_id):
+    """
+    Next page of meals from the pool kept by an earlier get_prepngo_meals
+    call by the same user. Returns None once the pool has expired or run out.
+    """
+    results = run_prepngo_more(pool_id, user_id)
+    if results is None:
+        return None
+    return _prepare_meals_for_display(results, user_id)
+
+def _prepare_meals_for_display(results, user_id):
     meals   = results.get("meals", [])
+    # saved/loved/notes for the whole page in one query
+    hydrate_meals(meals, user_id)
 
     # Just add empty arrays for ingredients and instructions to avoid template errors
     for m in meals:
@@ -105,16 +122,13 @@ def save_prepngo_results(meals, user_input, user_id):
     the Python lists back to JSON strings before saving.
     (But note: your session already has the real lists.)
     """
-    # make sure your table has the needed columns
-    migrate_meals_notes_table()
-
     # serialize before saving
     for m in meals:
         m["user_id"]      = user_id
         m["ingredients"]  = json.dumps(m.get("ingredients", []))
         m["instructions"] = json.dumps(m.get("instructions", []))
 
-    conn  = init_db("preprn.db")
+    conn  = init_db(DB_PATH)
     # If grocery is disabled, use 0 as budget fallback
     budget_str = str(user_input.get("budget") or "0").strip()
     budget = float(budget_str) if budget_str else 0.0
@@ -129,7 +143,7 @@ def save_prepngo_results(meals, user_input, user_id):
 
 # Retrieve saved meal recommendations for a user
 def get_saved_prepngo(user_id):
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     results = get_saved_meals(conn, user_id)
     conn.close()
     return results
@@ -137,7 +151,7 @@ def get_saved_prepngo(user_id):
 
 def clear_loved_meals_db(user_id):
     """Clear all loved meals for a user"""
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     from prepngo.database_functions import clear_loved_meals_db as clear_loved_db
     clear_loved_db(conn, user_id)
     conn.close()
@@ -145,7 +159,7 @@ def clear_loved_meals_db(user_id):
 
 def delete_individual_meal(user_id, meal_title):
     """Delete a specific meal for a user"""
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     cur = conn.cursor()
     
     # Delete from meals table where the meal belongs to this user
@@ -163,14 +177,14 @@ def delete_individual_meal(user_id, meal_title):
 
 # Clear all saved meal results for a user
 def clear_saved_prepngo(user_id):
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     clear_meals(conn, user_id)
     conn.close()
 
 
 # Toggle the love status of a meal for a user
 def toggle_meal_love(user_id, meal_name, meal_url):
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     from prepngo.database_functions import toggle_meal_love_status
     loved_status = toggle_meal_love_status(conn, user_id, meal_name, meal_url)
     conn.close()
@@ -179,54 +193,17 @@ def toggle_meal_love(user_id, meal_name, meal_url):
 
 # Get all loved meals for a user
 def get_loved_meals(user_id):
-    conn = init_db('preprn.db')
+    conn = init_db(DB_PATH)
     from prepngo.database_functions import get_user_loved_meals
     loved_meals = get_user_loved_meals(conn, user_id)
     conn.close()
     return loved_meals
 
 def migrate_meals_notes_table():
-    """Add notes, instructions, shopping_list columns to meals table if missing."""
-    with engine.connect() as conn:
-        # First, check if the meals table exists at all
-        try:
-            table_exists = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='meals'")).fetchone()
-            if not table_exists:
-                print("[DEBUG] Meals table doesn't exist, calling init_db to create it...")
-                # Close this connection and initialize the database properly
-                conn.close()
-                init_db_conn = init_db("preprn.db")
-                init_db_conn.close()
-                # Reconnect with a fresh connection
-                with engine.connect() as new_conn:
-                    _add_missing_columns(new_conn)
-            else:
-                _add_missing_columns(conn)
-        except Exception as e:
-            print(f"[ERROR] Error in migrate_meals_notes_table: {e}")
-            # If there's any error, try to initialize the database
-            init_db_conn = init_db("preprn.db")
-            init_db_conn.close()
-
-def _add_missing_columns(conn):
-    """Helper function to add missing columns to an existing meals table."""
-    for col, typ in [
-        ("notes",         "TEXT DEFAULT ''"),
-        ("instructions",  "TEXT DEFAULT ''"),
-        ("ingredients",   "TEXT DEFAULT ''"),
-        ("user_id",       "INTEGER"),
-    ]:
-        try:
-            conn.execute(text(f"SELECT {col} FROM meals LIMIT 1"))
-            print(f"[DEBUG] Column {col} already exists")
-        except Exception:
-            print(f"[DEBUG] Adding column {col}")
-            conn.execute(text(f"ALTER TABLE meals ADD COLUMN {col} {typ}"))
-            conn.commit()
-            print(f"✅ Added `{col}` column.")
+    """Notes, instructions and ingredients columns now come from shared.migrations."""
+    run_migrations()
 
 def update_meal_notes(user_id, title, notes):
-    migrate_meals_notes_table()
     with engine.connect() as conn:
         # Fixed query: use JOIN to connect meals -> requests -> user_id
         result = conn.execute(text("""
@@ -248,7 +225,6 @@ def update_meal_notes(user_id, title, notes):
             return False
 
 def get_meal_notes(user_id, title):
-    migrate_meals_notes_table()
     with engine.connect() as conn:
         # Fixed query: use JOIN to connect meals -> requests -> user_id
         row = conn.execute(text("""
@@ -1,24 +1,99 @@
-import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from shared.cache import TTLCache
+from shared.ratelimit import RateLimitExceeded, TokenBucket
+from shared.upstream import get_upstream
+from shared.circuit import CircuitOpenError
 
 API_KEY = os.getenv("SPOON_API_KEY")
 
-def get_random_meal_plan(budget, servings, tags):
+# one limiter shared by every Spoonacular call in the process. Defaults match
+# the free plan (60 requests/minute, 150 points/day); paid plans can raise them.
+# The daily points are counted in preprn.db, so restarts and extra workers
+# don't get a fresh quota.
+SPOON_REQUESTS_PER_SECOND = float(os.getenv("SPOON_REQUESTS_PER_SECOND", 1))
+SPOON_BURST = int(os.getenv("SPOON_BURST", 5))
+SPOON_DAILY_QUOTA = int(os.getenv("SPOON_DAILY_QUOTA", 150))
+SPOON_MAX_WORKERS = int(os.getenv("SPOON_MAX_WORKERS", 5))
+SPOON_ACQUIRE_TIMEOUT = float(os.getenv("SPOON_ACQUIRE_TIMEOUT", 10))
+
+spoon_limiter = TokenBucket(
+    rate_per_second=SPOON_REQUESTS_PER_SECOND,
+    burst=SPOON_BURST,
+    daily_limit=SPOON_DAILY_QUOTA,
+    name="spoonacular",
+)
+
+# pooled keep-alive client; Spoonacular can be slow, so the read timeout is generous
+spoonacular = get_upstream(
+    "spoonacular",
+    "https://api.spoonacular.com",
+    connect_timeout=float(os.getenv("SPOON_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("SPOON_READ_TIMEOUT", 10)),
+    retries=int(os.getenv("SPOON_RETRIES", 2)),
+    max_retry_after=float(os.getenv("SPOON_MAX_RETRY_AFTER", 2)),
+)
+
+# bounded pool for recipe-information lookups
+_recipe_pool = ThreadPoolExecutor(max_workers=SPOON_MAX_WORKERS, thread_name_prefix="spoonacular")
+
+# recipe information barely changes, so keep it for a day by default and cap
+# the table size so the least recently read recipes are evicted first
+RECIPE_CACHE_TTL = int(os.getenv("SPOON_RECIPE_CACHE_TTL", 24 * 60 * 60))
+RECIPE_CACHE_MAX_ROWS = int(os.getenv("SPOON_RECIPE_CACHE_MAX_ROWS", 5000))
+recipe_cache = TTLCache(
+    "spoonacular_recipe_cache",
+    ttl_seconds=RECIPE_CACHE_TTL,
+    memory_size=512,
+    max_rows=RECIPE_CACHE_MAX_ROWS,
+)
+
+# last good answer for each search, served while the Spoonacular breaker is
+# open or our own rate limit turns the request away
+SEARCH_FALLBACK_TTL = int(os.getenv("SPOON_SEARCH_FALLBACK_TTL", 7 * 24 * 60 * 60))
+search_fallback_cache = TTLCache(
+    "spoonacular_search_fallback",
+    ttl_seconds=SEARCH_FALLBACK_TTL,
+    memory_size=256,
+    max_rows=int(os.getenv("SPOON_SEARCH_FALLBACK_MAX_ROWS", 2000)),
+)
+
+def _search(key, fallback_key, url, params):
+    """
+    Coalesced search request. Successful answers are remembered under
+    `fallback_key`; while the breaker is open or the rate limiter refuses the
+    request (quota spent, no token in time) the last one is returned instead,
+    or None if this search was never answered.
+    """
+    try:
+        body = spoonacular.coalesce(key, _spoonacular_get, url, params)
+    except (CircuitOpenError, RateLimitExceeded) as e:
+        cached = search_fallback_cache.get(fallback_key)
+        print(f"[DEBUG] Spoonacular unavailable ({e}), {'serving cached' if cached is not None else 'no cached'} results for {fallback_key}")
+        return cached
+    search_fallback_cache.set(fallback_key, body)
+    return body
+
+def get_random_meal_plan(budget, servings, tags, number=3):
     """
     budget & servings are available if you want to compute per-meal price,
-    but the 'random' endpoint only supports 'tags'.
+    but the 'random' endpoint only supports 'tags'. `number` recipes come back
+    for the cost of one request, so callers that page through meals should
+    ask for the whole pool at once.
     """
-    url = "https://api.spoonacular.com/recipes/random"
+    url = "/recipes/random"
     # Lowercase & drop empty
     clean_tags = [t.lower() for t in tags if t]
     params = {
         "apiKey": API_KEY,
-        "number": 3,
+        "number": number,
         "tags": ",".join(clean_tags) or None,
     }
-    resp = requests.get(url, params={k: v for k, v in params.items() if v})
-    resp.raise_for_status()
-    data = resp.json().get("recipes", [])
+    # concurrent searches for the same tag set share one request
+    key = ("random", params["tags"], number)
+    body = _search(key, f"random|{params['tags'] or ''}", url, {k: v for k, v in params.items() if v})
+    data = (body or {}).get("recipes", [])
     meals = []
     for item in data:
         meals.append({
@@ -32,25 +107,60 @@ def get_random_meal_plan(budget, servings, tags):
 def find_by_ingredients(ingredients, number=5):
     api_key = os.getenv("SPOON_API_KEY")
 
-    response = requests.get(
-        "https://api.spoonacular.com/recipes/findByIngredients",
-        params={
-            "apiKey": api_key,
-            "ingredients": ",".join(ingredients),
-            "number": number,
-            "ranking": 1,  # prioritize recipes that use more of the ingredients
-            "ignorePantry": False,
-            
-        }
-    )
-    response.raise_for_status()
-    return response.json()
+    params = {
+        "apiKey": api_key,
+        "ingredients": ",".join(ingredients),
+        "number": number,
+        "ranking": 1,  # prioritize recipes that use more of the ingredients
+        "ignorePantry": False,
+        
+    }
+    key = ("findByIngredients", params["ingredients"], number)
+    fallback_key = "findByIngredients|" + ",".join(sorted(i.strip().lower() for i in ingredients))
+    return _search(key, fallback_key, "/recipes/findByIngredients", params) or []
 
 def get_recipe_information(recipe_id: int) -> dict:
+    """
+    Return the full /information payload for a recipe, served from the
+    recipe cache when we have fetched it recently.
+    """
+    cache_key = str(recipe_id)
+    cached = recipe_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # several users opening the same recipe at once share one request
+    info = spoonacular.coalesce(("information", cache_key), _fetch_recipe_information, recipe_id)
+    recipe_cache.set(cache_key, info)
+    return info
+
+def get_recipe_information_many(recipe_ids: List[int]) -> List[Optional[dict]]:
+    """
+    Fetch recipe information for several ids concurrently on the shared pool.
+    Every call still goes through the rate limiter. Results come back in the
+    same order as `recipe_ids`, with None for any recipe that failed.
+    """
+    def fetch(recipe_id):
+        try:
+            return get_recipe_information(recipe_id)
+        except Exception as e:
+            print("[ERROR] Failed to fetch details for recipe:", recipe_id, e)
+            return None
+
+    return list(_recipe_pool.map(fetch, recipe_ids))
+
+def _fetch_recipe_information(recipe_id: int) -> dict:
     api_key = os.getenv("SPOON_API_KEY")
-    url = f"https://api.spoonacular.com/recipes/{recipe_id}/information"
+    url = f"/recipes/{recipe_id}/information"
     params = {"apiKey": api_key}
+    return _spoonacular_get(url, params)
 
-    response = requests.get(url, params=params)
+def _spoonacular_get(url: str, params: dict):
+    """One rate-limited Spoonacular GET, returning the decoded JSON body."""
+    # don't spend a rate-limit token on a call the breaker will reject
+    if not spoonacular.breaker.available():
+        raise CircuitOpenError("spoonacular circuit is open")
+    spoon_limiter.acquire(timeout=SPOON_ACQUIRE_TIMEOUT)
+    response = spoonacular.get(url, params=params)
     response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    return response.json()
@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# One pool of worker threads for every blocking call, shared by all requests.
+# asyncio.to_thread would use each event loop's default executor, which
+# run_sync's per-request loop would create and tear down every time.
+AIO_MAX_WORKERS = int(os.getenv("AIO_MAX_WORKERS", 16))
+_executor = ThreadPoolExecutor(max_workers=AIO_MAX_WORKERS, thread_name_prefix="aio")
+
+# runs run_sync's loop when the caller already has one running
+_loop_runner = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aio-loop")
+
+
+async def call(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call (an upstream request, a DB query, a GenAI prompt) on a
+    worker thread so several of them can be awaited together. The upstream
+    clients keep their own pooled sessions, timeouts and retries.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def call_quietly(fn: Callable[..., T], *args: Any, default: Any = None, **kwargs: Any) -> T:
+    """Like `call`, but log and return `default` instead of raising."""
+    try:
+        return await call(fn, *args, **kwargs)
+    except Exception as e:
+        print(f"[DEBUG] {getattr(fn, '__name__', fn)} failed: {e}")
+        return default
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """
+    Sync facade for the Flask routes: run a coroutine to completion and return
+    its result. If the calling thread already has an event loop running, the
+    coroutine gets its own loop on a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+
+    return _loop_runner.submit(asyncio.run, awaitable).result()
@@ -3,22 +3,15 @@ import sqlalchemy as db
 from sqlalchemy import inspect
 
 
-# Create a SQLite engine using 'preprn.db'
-engine = db.create_engine("sqlite:///preprn.db")
+# Shared pooled engine for 'preprn.db'
+from shared.db import engine
+from shared.migrations import run_migrations
 inspector = inspect(engine)
 
 
-# Function to create a users table if it doesn't already exist
+# Function to create a users table if it doesn't already exist (see shared.migrations)
 def create_user_table():
-    with engine.connect() as connection:
-        connection.execute(db.text("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL
-            )
-        """))
-        connection.commit()
+    run_migrations()
 
 
 # Function to register a new user
@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from shared import db as shared_db
+from shared.db import raw_connection
+
+
+class TTLCache:
+    """
+    Key/value cache for JSON-serializable upstream responses.
+
+    Entries are stored in their own table in preprn.db (created by a
+    shared.migrations migration, see CACHE_TABLES) so they survive restarts
+    and are shared between app workers. The most recently used entries are also
+    kept in an in-process LRU so repeat lookups never touch the database.
+    Values are stored as JSON, so every `get` hands back a fresh copy that the
+    caller is free to mutate.
+
+    If `max_rows` is set, the table is kept to that many rows by evicting the
+    least recently read entries whenever a new one is written. Reads served
+    from memory record themselves in the table too, at most once every
+    `touch_interval` seconds per key, so hot keys are never the ones evicted.
+
+    Without a `db_path` the cache uses shared.db.DB_PATH, looked up on each
+    connection rather than when the cache is built, so module-level caches
+    don't pin a database file at import time.
+    """
+
+    def __init__(self, table: str, ttl_seconds: float, memory_size: int = 256,
+                 db_path: Optional[str] = None, max_rows: Optional[int] = None,
+                 touch_interval: float = 60):
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self._db_path = db_path
+        self.max_rows = max_rows
+        self.touch_interval = touch_interval
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> (expires_at, payload, when accessed_at was last written)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or shared_db.DB_PATH
+
+    def _connect(self):
+        # pooled connection; close() returns it to the pool. The table itself
+        # is created by shared.migrations at startup.
+        return raw_connection(self.db_path)
+
+    def _remember(self, key: str, expires_at: float, payload: str, touched_at: float) -> None:
+        """Put an entry at the front of the in-memory LRU, evicting the oldest."""
+        with self._lock:
+            self._memory[key] = (expires_at, payload, touched_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        now = time.time()
+
+        touch = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, payload, touched_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    touch = bool(self.max_rows) and now - touched_at >= self.touch_interval
+                    if touch:
+                        self._memory[key] = (expires_at, payload, now)
+                else:
+                    del self._memory[key]
+                    entry = None
+
+        if entry is not None:
+            if touch:
+                self._touch(key, now)
+            return json.loads(payload)
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT payload, expires_at FROM {self.table} WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None and row[1] > now and self.max_rows:
+                conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE cache_key = ?",
+                    (now, key)
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+        if row is None or row[1] <= now:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        payload, expires_at = row
+        self._remember(key, expires_at, payload, now)
+        with self._lock:
+            self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` for `ttl_seconds`."""
+        payload = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {self.table} (cache_key, payload, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, payload, expires_at, now)
+            )
+            if self.max_rows:
+                self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+        self._remember(key, expires_at, payload, now)
+
+    def _touch(self, key: str, now: float) -> None:
+        """Record a read served from memory, so eviction sees the key as used."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now: float) -> None:
+        """Trim the table to `max_rows`, dropping expired then least recently read rows."""
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = count - self.max_rows
+        if excess <= 0:
+            return
+        cur = conn.execute(
+            f"""
+            DELETE FROM {self.table} WHERE cache_key IN (
+                SELECT cache_key FROM {self.table}
+                ORDER BY expires_at > ?, accessed_at
+                LIMIT ?
+            )
+            """,
+            (now, excess)
+        )
+        with self._lock:
+            self.evictions += cur.rowcount
+
+    def delete(self, key: str) -> None:
+        """Drop a single entry from both the memory and database layers."""
+        with self._lock:
+            self._memory.pop(key, None)
+        conn = self._connect()
+        try:
+            conn.execute(f"DELETE FROM {self.table} WHERE cache_key = ?", (key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the database and return how many were removed."""
+        conn = self._connect()
+        try:
+            cur = conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit/miss counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.memory_hits = self.misses = 0
+        conn = self._connect()
+        try:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for logging or a debug endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "table": self.table,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
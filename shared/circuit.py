@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one upstream.
+
+    While closed, the outcome of the last `window` calls is tracked; once at
+    least `min_calls` have been seen and the share of failures reaches
+    `failure_rate`, the breaker opens. Calls slower than `slow_call_seconds`
+    count as failures too. An open breaker rejects calls immediately for
+    `open_seconds`, then lets `half_open_calls` trial calls through: if they
+    succeed it closes again, if any fails it reopens.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5,
+                 window: int = 20, slow_call_seconds: Optional[float] = None,
+                 open_seconds: float = 30, half_open_calls: int = 1,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self._clock = clock
+
+        self._state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True = failure
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._rejected = 0
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        print(f"[DEBUG] Circuit '{self.name}' opened for {self.open_seconds}s")
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def available(self) -> bool:
+        """True if a call would currently be let through (does not reserve it)."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state == CLOSED or (
+                self._state == HALF_OPEN and self._trials < self.half_open_calls
+            )
+
+    def allow(self) -> bool:
+        """Reserve a call. Every allowed call must be followed by record()."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record(self, success: bool, duration: float = 0.0) -> None:
+        """Record the outcome of an allowed call."""
+        if self.slow_call_seconds is not None and duration > self.slow_call_seconds:
+            success = False
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if not success:
+                    self._open()
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    print(f"[DEBUG] Circuit '{self.name}' closed")
+                return
+            if self._state == OPEN:
+                # a call that was let through before the breaker opened
+                return
+
+            self._outcomes.append(not success)
+            if len(self._outcomes) >= self.min_calls:
+                failures = sum(self._outcomes)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `fn` through the breaker, raising CircuitOpenError if it is open."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        start = self._clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, self._clock() - start)
+            raise
+        self.record(True, self._clock() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": sum(self._outcomes),
+                "rejected": self._rejected,
+                "times_opened": self._times_opened,
+            }
+
+
+def breaker_from_env(name: str, **defaults: Any) -> CircuitBreaker:
+    """
+    Build a breaker for `name`, letting <NAME>_BREAKER_* environment variables
+    override the defaults (FAILURE_RATE, MIN_CALLS, WINDOW, SLOW_SECONDS,
+    OPEN_SECONDS).
+    """
+    prefix = f"{name.upper()}_BREAKER_"
+
+    def setting(key, cast, default):
+        value = os.getenv(prefix + key)
+        return cast(value) if value not in (None, "") else default
+
+    return CircuitBreaker(
+        name,
+        failure_rate=setting("FAILURE_RATE", float, defaults.get("failure_rate", 0.5)),
+        min_calls=setting("MIN_CALLS", int, defaults.get("min_calls", 5)),
+        window=setting("WINDOW", int, defaults.get("window", 20)),
+        slow_call_seconds=setting("SLOW_SECONDS", float, defaults.get("slow_call_seconds")),
+        open_seconds=setting("OPEN_SECONDS", float, defaults.get("open_seconds", 30)),
+    )
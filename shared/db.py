@@ -0,0 +1,67 @@
+# Single place that opens preprn.db
+# Every module gets its connections from one pooled SQLAlchemy engine per
+# database file, so connection setup and pragmas happen once per pooled
+# connection instead of on every request.
+import os
+import threading
+from typing import Dict
+
+import sqlalchemy as db
+from sqlalchemy import event
+
+DB_PATH = os.getenv("PREPRN_DB_PATH", "preprn.db")
+
+# how long a writer waits for another writer's lock before giving up
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+_engines: Dict[str, db.engine.Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _configure_connection(dbapi_connection, connection_record):
+    """
+    Pragmas for every new pooled connection. WAL lets readers keep reading
+    while a writer commits; synchronous=NORMAL is safe with WAL and skips an
+    fsync per commit.
+    """
+    cur = dbapi_connection.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-16000")  # 16 MB page cache per connection
+    cur.close()
+
+
+def get_engine(path: str = DB_PATH) -> db.engine.Engine:
+    """The shared pooled engine for `path`, created on first use."""
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine is None:
+            engine = db.create_engine(
+                f"sqlite:///{path}",
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                connect_args={
+                    # pooled connections move between request threads
+                    "check_same_thread": False,
+                    "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+                },
+            )
+            event.listen(engine, "connect", _configure_connection)
+            _engines[path] = engine
+        return engine
+
+
+def raw_connection(path: str = DB_PATH):
+    """
+    A pooled DB-API connection for sqlite3-style code (cursor(), execute(),
+    commit()). close() hands it back to the pool instead of closing it.
+    """
+    return get_engine(path).raw_connection()
+
+
+# engine for preprn.db, used by the SQLAlchemy-style modules
+engine = get_engine()
@@ -0,0 +1,113 @@
+# Per-user status (saved, loved, notes) for lists of restaurants or meals
+# Each list is looked up with one query instead of one query per item, so
+# result pages cost the same number of DB round trips however many they show.
+from typing import Any, Dict, Iterable, List
+
+from shared.db import DB_PATH, raw_connection
+
+# stay well under SQLite's limit on bound parameters per statement
+_MAX_PARAMS = 400
+
+
+def _chunks(values: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _placeholders(values: List[Any]) -> str:
+    return ",".join("?" * len(values))
+
+
+def _merge(found: Dict[Any, Dict[str, Any]], key: Any, loved: Any, notes: Any) -> None:
+    """A user can have saved the same item more than once; any loved copy counts."""
+    status = found.setdefault(key, {"saved": True, "loved": False, "notes": ""})
+    status["loved"] = status["loved"] or bool(loved)
+    if notes and not status["notes"]:
+        status["notes"] = notes
+
+
+def restaurant_status(restaurants: List[Dict[str, Any]], user_id: int,
+                      db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """
+    {"saved", "loved", "notes"} for each restaurant, in order. Restaurants are
+    matched on their Yelp id when they have one, otherwise on name and location.
+    """
+    by_id: Dict[Any, Dict[str, Any]] = {}
+    by_place: Dict[Any, Dict[str, Any]] = {}
+
+    if restaurants and user_id is not None:
+        conn = raw_connection(db_path)
+        try:
+            # each restaurant binds at most two parameters
+            for chunk in _chunks(restaurants, _MAX_PARAMS // 2):
+                yelp_ids = sorted({r["yelp_id"] for r in chunk if r.get("yelp_id")})
+                names = sorted({r["name"] for r in chunk})
+                rows = conn.execute(f"""
+                    SELECT yelp_id, name, location, loved, notes
+                      FROM foodiesrn_recommendations
+                     WHERE user_id = ?
+                       AND (yelp_id IN ({_placeholders(yelp_ids)}) OR name IN ({_placeholders(names)}))
+                """, [user_id, *yelp_ids, *names]).fetchall()
+                for yelp_id, name, location, loved, notes in rows:
+                    if yelp_id:
+                        _merge(by_id, yelp_id, loved, notes)
+                    _merge(by_place, (name, location), loved, notes)
+        finally:
+            conn.close()
+
+    missing = {"saved": False, "loved": False, "notes": ""}
+    return [
+        dict(by_id.get(r.get("yelp_id")) or by_place.get((r["name"], r.get("location"))) or missing)
+        for r in restaurants
+    ]
+
+
+def meal_status(meals: List[Dict[str, Any]], user_id: int,
+                db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """
+    {"saved", "loved", "notes"} for each meal, in order. Saved and loved match
+    on title and source url (as toggling a meal does); notes match on title.
+    """
+    by_recipe: Dict[Any, Dict[str, Any]] = {}
+    by_title: Dict[Any, Dict[str, Any]] = {}
+    titles = sorted({m["title"] for m in meals})
+
+    if meals and user_id is not None:
+        conn = raw_connection(db_path)
+        try:
+            for title_chunk in _chunks(titles, _MAX_PARAMS - 1):
+                rows = conn.execute(f"""
+                    SELECT meals.title, meals.source_url, meals.loved, meals.notes
+                      FROM meals
+                      JOIN requests ON meals.request_id = requests.id
+                     WHERE requests.user_id = ? AND meals.title IN ({_placeholders(title_chunk)})
+                """, [user_id, *title_chunk]).fetchall()
+                for title, source_url, loved, notes in rows:
+                    _merge(by_recipe, (title, source_url), loved, notes)
+                    _merge(by_title, title, False, notes)
+        finally:
+            conn.close()
+
+    statuses = []
+    for m in meals:
+        status = dict(by_recipe.get((m["title"], m.get("source_url")))
+                      or {"saved": False, "loved": False, "notes": ""})
+        status["notes"] = status["notes"] or by_title.get(m["title"], {}).get("notes", "")
+        statuses.append(status)
+    return statuses
+
+
+def hydrate_restaurants(restaurants: List[Dict[str, Any]], user_id: int,
+                        db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Fill in saved/loved/notes on each restaurant dict and return the list."""
+    for restaurant, status in zip(restaurants, restaurant_status(restaurants, user_id, db_path)):
+        restaurant.update(status)
+    return restaurants
+
+
+def hydrate_meals(meals: List[Dict[str, Any]], user_id: int,
+                  db_path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Fill in saved/loved/notes on each meal dict and return the list."""
+    for meal, status in zip(meals, meal_status(meals, user_id, db_path)):
+        meal.update(status)
+    return meals
@@ -0,0 +1,317 @@
+# Versioned schema migrations for preprn.db
+# All DDL lives here and runs once at startup (app.py) or on first use of a
+# database file, so request handlers never create or alter tables.
+import logging
+import threading
+import time
+from typing import Callable, List, Tuple
+
+from shared.db import DB_PATH, raw_connection
+
+logger = logging.getLogger(__name__)
+
+
+def _add_column(conn, table: str, column: str, declaration: str) -> None:
+    """ALTER TABLE ... ADD COLUMN, skipped if the column is already there"""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def _users_pantry_profile(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pantry_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            item TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_profile (
+            user_id        INTEGER PRIMARY KEY,
+            restrictions   TEXT    DEFAULT '',
+            weekly_budget  REAL    DEFAULT 0.0,
+            daily_percent  REAL    DEFAULT 0.5
+        )
+    """)
+
+
+def _foodiesrn_recommendations(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS foodiesrn_recommendations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            location TEXT,
+            price TEXT,
+            rating REAL,
+            url TEXT,
+            user_location TEXT,
+            cuisine TEXT,
+            vibe TEXT,
+            user_id INTEGER,
+            image_url TEXT
+        )
+    """)
+    # columns added after the first release
+    _add_column(conn, "foodiesrn_recommendations", "distance_meters", "REAL")
+    _add_column(conn, "foodiesrn_recommendations", "driving_distance_miles", "REAL")
+    _add_column(conn, "foodiesrn_recommendations", "driving_duration_minutes", "REAL")
+    _add_column(conn, "foodiesrn_recommendations", "loved", "BOOLEAN DEFAULT FALSE")
+    _add_column(conn, "foodiesrn_recommendations", "notes", "TEXT DEFAULT ''")
+
+
+def _foodiesrn_coordinates(conn) -> None:
+    _add_column(conn, "foodiesrn_recommendations", "latitude", "REAL")
+    _add_column(conn, "foodiesrn_recommendations", "longitude", "REAL")
+
+
+def _prepngo_tables(conn) -> None:
+    # user requests
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            budget REAL NOT NULL,
+            servings INTEGER NOT NULL,
+            diets TEXT
+        )
+    """)
+    # meals generated from a request
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS meals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id INTEGER NOT NULL,
+            title TEXT,
+            price REAL,
+            diets TEXT,
+            summary TEXT,
+            source_url TEXT,
+            loved INTEGER DEFAULT 0,
+            FOREIGN KEY(request_id) REFERENCES requests(id)
+        )
+    """)
+    _add_column(conn, "meals", "loved", "INTEGER DEFAULT 0")
+    _add_column(conn, "meals", "meal_type", 'TEXT DEFAULT ""')
+    # feedback on a request
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id INTEGER NOT NULL,
+            satisfied BOOLEAN NOT NULL,
+            comments TEXT,
+            FOREIGN KEY(request_id) REFERENCES requests(id)
+        )
+    """)
+    # Gemini-generated local store suggestions
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS local_stores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id INTEGER NOT NULL,
+            city TEXT,
+            state TEXT,
+            suggestions TEXT,
+            FOREIGN KEY(request_id) REFERENCES requests(id)
+        )
+    """)
+
+
+def _meal_notes(conn) -> None:
+    _add_column(conn, "meals", "notes", "TEXT DEFAULT ''")
+    _add_column(conn, "meals", "instructions", "TEXT DEFAULT ''")
+    _add_column(conn, "meals", "ingredients", "TEXT DEFAULT ''")
+    _add_column(conn, "meals", "user_id", "INTEGER")
+
+
+def _per_user_indexes(conn) -> None:
+    # FoodiesRN saved/loved/notes lookups: user_id + name + location
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_foodiesrn_user_name_location
+            ON foodiesrn_recommendations (user_id, name, location)
+    """)
+    # loved restaurants only; the partial index stays small
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_foodiesrn_user_loved
+            ON foodiesrn_recommendations (user_id) WHERE loved = TRUE
+    """)
+    # meals are reached through requests.user_id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_requests_user ON requests (user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_request_title ON meals (request_id, title)")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_meals_request_loved
+            ON meals (request_id) WHERE loved = 1
+    """)
+    # also serves the ORDER BY item of the pantry listing
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pantry_user_item ON pantry_items (user_id, item)")
+
+
+def _foodiesrn_yelp_id(conn) -> None:
+    # one row per Yelp business per user, so save_to_db can upsert;
+    # rows saved before this have no yelp_id until save_to_db sees the
+    # business again and claims the row for it
+    _add_column(conn, "foodiesrn_recommendations", "yelp_id", "TEXT")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_foodiesrn_user_yelp
+            ON foodiesrn_recommendations (user_id, yelp_id)
+    """)
+
+
+def _foodiesrn_collapse_duplicates(conn) -> None:
+    # saves without a yelp_id used to be inserted again on every save, and a
+    # business saved with its id got a new row next to its legacy one. Fold
+    # each user's copies of a place into one row, keeping any loved flag and
+    # the first non-empty notes: the id'd row if there is one, else the oldest.
+    same_place = """
+        dup.user_id IS foodiesrn_recommendations.user_id
+        AND dup.name = foodiesrn_recommendations.name
+        AND dup.location IS foodiesrn_recommendations.location
+        AND dup.id != foodiesrn_recommendations.id
+        AND dup.yelp_id IS NULL
+    """
+    keeper = """
+        (yelp_id IS NOT NULL OR id IS (
+            SELECT MIN(oldest.id) FROM foodiesrn_recommendations oldest
+             WHERE oldest.user_id IS foodiesrn_recommendations.user_id
+               AND oldest.name = foodiesrn_recommendations.name
+               AND oldest.location IS foodiesrn_recommendations.location
+               AND oldest.yelp_id IS NULL
+               AND NOT EXISTS (
+                   SELECT 1 FROM foodiesrn_recommendations keyed
+                    WHERE keyed.user_id IS oldest.user_id AND keyed.name = oldest.name
+                      AND keyed.location IS oldest.location AND keyed.yelp_id IS NOT NULL)
+        ))
+    """
+    conn.execute(f"""
+        UPDATE foodiesrn_recommendations
+           SET loved = (loved OR EXISTS (
+                   SELECT 1 FROM foodiesrn_recommendations dup WHERE {same_place} AND dup.loved)),
+               notes = COALESCE(NULLIF(notes, ''), (
+                   SELECT dup.notes FROM foodiesrn_recommendations dup
+                    WHERE {same_place} AND COALESCE(dup.notes, '') != ''
+                    ORDER BY dup.id LIMIT 1), '')
+         WHERE {keeper}
+    """)
+    conn.execute(f"""
+        DELETE FROM foodiesrn_recommendations
+         WHERE yelp_id IS NULL AND NOT {keeper}
+    """)
+
+
+def _rate_limit_usage(conn) -> None:
+    # daily quota spent per rate limiter, shared by every worker process
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_limit_usage (
+            name TEXT NOT NULL,
+            day  TEXT NOT NULL,
+            used REAL NOT NULL,
+            PRIMARY KEY (name, day)
+        )
+    """)
+
+
+# TTLCache tables of the upstream and GenAI caches
+CACHE_TABLES = [
+    "yelp_search_cache_v2",
+    "foodies_candidate_pool",
+    "geoapify_route_cache",
+    "spoonacular_recipe_cache",
+    "spoonacular_search_fallback",
+    "prepngo_meal_pool",
+    "genai_text_cache",
+]
+
+
+def create_cache_table(conn, table: str) -> None:
+    """The key/value table a shared.cache.TTLCache named `table` reads and writes"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            cache_key   TEXT PRIMARY KEY,
+            payload     TEXT NOT NULL,
+            expires_at  REAL NOT NULL,
+            accessed_at REAL NOT NULL DEFAULT 0
+        )
+    """)
+    # tables created by the cache itself before accessed_at existed
+    _add_column(conn, table, "accessed_at", "REAL NOT NULL DEFAULT 0")
+
+
+def _cache_tables(conn) -> None:
+    for table in CACHE_TABLES:
+        create_cache_table(conn, table)
+
+
+# (version, name, migration) in the order they must run. Append new entries;
+# never renumber or edit one that has shipped. Every migration is written to
+# be safe on databases that predate this runner.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "users, pantry and profile tables", _users_pantry_profile),
+    (2, "foodiesrn recommendations table", _foodiesrn_recommendations),
+    (3, "foodiesrn restaurant coordinates", _foodiesrn_coordinates),
+    (4, "prepngo requests, meals, feedback and stores", _prepngo_tables),
+    (5, "meal notes, instructions and ingredients", _meal_notes),
+    (6, "per-user lookup indexes", _per_user_indexes),
+    (7, "foodiesrn yelp business id", _foodiesrn_yelp_id),
+    (8, "upstream and genai cache tables", _cache_tables),
+    (9, "collapse duplicate foodiesrn saves", _foodiesrn_collapse_duplicates),
+    (10, "rate limit daily usage", _rate_limit_usage),
+]
+
+_migrated_paths = set()
+_migrate_lock = threading.Lock()
+
+
+def current_version(conn) -> int:
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(path: str = DB_PATH) -> int:
+    """
+    Apply every pending migration to `path` and return the schema version.
+    Each migration runs in its own write transaction together with its
+    schema_version row, so concurrent workers starting up apply it once.
+    After the first call a process never touches the database again here.
+    """
+    with _migrate_lock:
+        if path in _migrated_paths:
+            return MIGRATIONS[-1][0]
+
+        conn = raw_connection(path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version    INTEGER PRIMARY KEY,
+                    name       TEXT NOT NULL,
+                    applied_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+
+            for version, name, migrate in MIGRATIONS:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if current_version(conn) >= version:
+                        conn.rollback()
+                        continue
+                    migrate(conn)
+                    conn.execute(
+                        "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                        (version, name, time.time()),
+                    )
+                    conn.commit()
+                    logger.info("Applied migration %d: %s", version, name)
+                except Exception:
+                    conn.rollback()
+                    raise
+            version = current_version(conn)
+        finally:
+            conn.close()
+
+        _migrated_paths.add(path)
+        return version
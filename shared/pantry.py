@@ -1,25 +1,15 @@
-import sqlite3
 from typing import List
-
-DB_PATH = "preprn.db"
+from shared.db import DB_PATH, raw_connection
+from shared.migrations import run_migrations
 TABLE_NAME = "pantry_items"
 
 def init_pantry_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            item TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
+    # the pantry_items table is created by shared.migrations
+    run_migrations()
 
 def get_pantry_items(user_id: int) -> List[str]:
     """Fetch all pantry items for this user."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = raw_connection(DB_PATH)
     cur = conn.cursor()
     cur.execute(f"""
         SELECT item
@@ -33,7 +23,7 @@ def get_pantry_items(user_id: int) -> List[str]:
 
 def add_pantry_item(user_id: int, item_name: str) -> None:
     """Insert a new pantry item (if it doesn’t already exist)."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = raw_connection(DB_PATH)
     cur = conn.cursor()
     # avoid exact duplicates
     cur.execute(f"""
@@ -50,7 +40,7 @@ def add_pantry_item(user_id: int, item_name: str) -> None:
 
 def remove_pantry_item(user_id: int, item_name: str) -> None:
     """Delete one pantry item by name."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = raw_connection(DB_PATH)
     cur = conn.cursor()
     cur.execute(f"""
         DELETE FROM {TABLE_NAME}
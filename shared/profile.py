@@ -1,22 +1,11 @@
-import sqlite3
 from typing import List, Tuple
-
-DB_PATH = "preprn.db"
+from shared.db import DB_PATH, raw_connection
 TABLE = "user_profile"
 
 def _connect():
-    conn = sqlite3.connect(DB_PATH)
+    # the user_profile table is created by shared.migrations at startup
+    conn = raw_connection(DB_PATH)
     cur = conn.cursor()
-    # ensure table exists
-    cur.execute(f"""
-      CREATE TABLE IF NOT EXISTS {TABLE} (
-        user_id        INTEGER PRIMARY KEY,
-        restrictions   TEXT    DEFAULT '',
-        weekly_budget  REAL    DEFAULT 0.0,
-        daily_percent  REAL    DEFAULT 0.5
-      )
-    """)
-    conn.commit()
     return conn, cur
 
 def get_user_restrictions(user_id: int) -> List[str]:
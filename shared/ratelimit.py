@@ -0,0 +1,163 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from shared import db as shared_db
+from shared.db import raw_connection
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be admitted within the configured limits."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every caller of one upstream API.
+
+    Tokens refill at `rate_per_second` up to `burst`, so short bursts go out
+    immediately while the long-run rate stays under the plan limit. An optional
+    `daily_limit` caps total usage per UTC day (Spoonacular resets its quota at
+    midnight UTC).
+
+    With a `name`, the daily usage is counted in the rate_limit_usage table of
+    preprn.db (or `db_path`) instead of in memory, so it survives restarts and
+    every worker process draws on the same daily quota.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1,
+                 daily_limit: Optional[int] = None, clock=time.monotonic,
+                 name: Optional[str] = None, db_path: Optional[str] = None):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.daily_limit = daily_limit
+        self.name = name
+        self._db_path = db_path
+        self._clock = clock
+
+        self._tokens = float(self.burst)
+        self._last_refill = clock()
+        self._day = self._today()
+        self._used_today = 0
+        self._waits = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path or shared_db.DB_PATH
+
+    @property
+    def _persisted(self) -> bool:
+        return self.name is not None and self.daily_limit is not None
+
+    def _spend_persisted(self, cost: float) -> bool:
+        """
+        Add `cost` to today's stored usage unless that would pass the daily
+        limit, in one statement so concurrent processes can't both spend the
+        last points. Returns False if the quota is spent.
+        """
+        conn = raw_connection(self.db_path)
+        try:
+            row = conn.execute(
+                """
+                INSERT INTO rate_limit_usage (name, day, used) VALUES (?, ?, ?)
+                ON CONFLICT (name, day) DO UPDATE SET used = used + excluded.used
+                    WHERE used + excluded.used <= ?
+                RETURNING used
+                """,
+                (self.name, self._day.isoformat(), cost, self.daily_limit)
+            ).fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        if row is None:
+            return False
+        self._used_today = row[0]
+        return True
+
+    def _stored_usage(self) -> float:
+        conn = raw_connection(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT used FROM rate_limit_usage WHERE name = ? AND day = ?",
+                (self.name, self._today().isoformat())
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+            self._last_refill = now
+
+    def acquire(self, cost: float = 1, timeout: Optional[float] = None) -> None:
+        """
+        Block until `cost` tokens are available and take them.
+        Raises RateLimitExceeded if the daily quota is spent or if no token
+        frees up within `timeout` seconds.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        waited = False
+
+        while True:
+            with self._lock:
+                today = self._today()
+                if today != self._day:
+                    self._day = today
+                    self._used_today = 0
+                if self.daily_limit is not None and cost > self.daily_limit - self._used_today:
+                    raise RateLimitExceeded(
+                        f"daily limit of {self.daily_limit} requests reached"
+                    )
+
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= cost:
+                    if self._persisted:
+                        # other processes may have spent the quota meanwhile
+                        if not self._spend_persisted(cost):
+                            self._used_today = self.daily_limit
+                            raise RateLimitExceeded(
+                                f"daily limit of {self.daily_limit} requests reached"
+                            )
+                    else:
+                        self._used_today += cost
+                    self._tokens -= cost
+                    if waited:
+                        self._waits += 1
+                    return
+
+                wait = (cost - self._tokens) / self.rate_per_second
+
+            if deadline is not None and now + wait > deadline:
+                raise RateLimitExceeded(f"no token available within {timeout}s")
+            waited = True
+            time.sleep(wait)
+
+    def daily_quota_spent(self, cost: float = 1) -> bool:
+        """True if a request costing `cost` would be refused by the daily limit."""
+        if self.daily_limit is None:
+            return False
+        if self._persisted:
+            used = self._stored_usage()
+        else:
+            with self._lock:
+                used = self._used_today if self._day == self._today() else 0
+        return used + cost > self.daily_limit
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current bucket state for logging."""
+        with self._lock:
+            self._refill(self._clock())
+            return {
+                "tokens": round(self._tokens, 2),
+                "used_today": self._used_today,
+                "daily_limit": self.daily_limit,
+                "waits": self._waits,
+            }
@@ -0,0 +1,253 @@
+import copy
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.circuit import CircuitBreaker, CircuitOpenError, breaker_from_env
+
+# statuses worth another try: rate limited or a server-side hiccup
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for `key` is in flight,
+    later callers with the same key wait for it and share its result instead
+    of making their own request. Waiters get a deep copy, so callers can keep
+    mutating what they receive. Errors are shared the same way.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Any, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fn(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # no new waiters can join once the key is gone
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        # waiters copy the shared result, so the leader must not hand out the original
+        return copy.deepcopy(flight.result) if flight.waiters else flight.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+class Upstream:
+    """
+    Pooled HTTP client for one upstream API.
+
+    Every call goes through one `requests.Session`, so TCP/TLS connections are
+    kept alive and reused across requests and threads. Each request gets the
+    upstream's (connect, read) timeout unless the caller passes its own.
+    Connection errors, timeouts and RETRY_STATUSES responses are retried up to
+    `retries` times with full-jitter exponential backoff; a Retry-After header
+    is honoured when it is no longer than `max_retry_after` seconds, otherwise
+    the error response is returned at once so the caller can fall back rather
+    than hold the user's request while it waits. A request
+    whose retries all fail counts as one failure for the upstream's circuit
+    breaker, and so does one slower than `slow_call_seconds` (half the read
+    timeout unless given), so a degraded upstream trips it too.
+    """
+
+    def __init__(self, name: str, base_url: str, connect_timeout: float = 3.05,
+                 read_timeout: float = 10, retries: int = 2, backoff: float = 0.3,
+                 max_backoff: float = 5, max_retry_after: float = 2,
+                 pool_size: int = 10, breaker: Optional[CircuitBreaker] = None,
+                 slow_call_seconds: Optional[float] = None, sleep=time.sleep):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self._sleep = sleep
+
+        self.session = requests.Session()
+        # retries are handled here rather than by urllib3 so Retry-After and
+        # the stats below cover every attempt
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount(self.base_url, adapter)
+
+        self.flights = SingleFlight()
+        # an open breaker fails calls immediately so callers reach their fallback
+        if slow_call_seconds is None:
+            slow_call_seconds = read_timeout / 2
+        self.breaker = breaker or breaker_from_env(name, slow_call_seconds=slow_call_seconds)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+
+    def _url(self, path: str) -> str:
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds asked for by a Retry-After header (delta or HTTP date), if any."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying transient failures. Returns the final
+        response (which may still be an error status); raises the last
+        requests exception if every attempt failed to connect, or
+        CircuitOpenError without touching the network while the upstream's
+        breaker is open.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = self._url(path)
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        start = time.monotonic()
+        try:
+            response = self._send(method, url, kwargs)
+        except Exception:
+            self.breaker.record(False, time.monotonic() - start)
+            raise
+        self.breaker.record(response.status_code not in RETRY_STATUSES, time.monotonic() - start)
+        return response
+
+    def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        for attempt in range(self.retries + 1):
+            with self._lock:
+                self._requests += 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    with self._lock:
+                        self._failures += 1
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"[DEBUG] {self.name} request failed ({e}), retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    if response.status_code >= 500 or response.status_code == 429:
+                        with self._lock:
+                            self._failures += 1
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                elif delay > self.max_retry_after:
+                    # the upstream wants us gone for longer than a user will wait
+                    with self._lock:
+                        self._failures += 1
+                    return response
+                print(f"[DEBUG] {self.name} returned {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+                response.close()
+
+            with self._lock:
+                self._retries += 1
+            self._sleep(delay)
+
+    def coalesce(self, key: Any, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `fn(*args, **kwargs)` unless an identical call (same `key`) to this
+        upstream is already in flight, in which case share its result.
+        """
+        return self.flights.do(key, fn, *args, **kwargs)
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "coalesced": self.flights.coalesced,
+                "breaker": self.breaker.stats(),
+            }
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str, base_url: str, **config: Any) -> Upstream:
+    """
+    Return the process-wide client for `name`, creating it with `config` on
+    first use. Later calls share the same pooled session.
+    """
+    with _upstreams_lock:
+        client = _upstreams.get(name)
+        if client is None:
+            client = Upstream(name, base_url, **config)
+            _upstreams[name] = client
+        return client
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every upstream client created so far, keyed by name."""
+    with _upstreams_lock:
+        clients = list(_upstreams.values())
+    return {client.name: client.stats() for client in clients}
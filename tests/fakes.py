@@ -0,0 +1,14 @@
+# Test doubles shared by several test modules
+
+
+class DictCache:
+    """Stands in for a shared.cache.TTLCache so tests never touch preprn.db."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
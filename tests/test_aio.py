@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+import unittest
+from shared import aio
+
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+def boom():
+    raise RuntimeError("upstream down")
+
+
+class TestAio(unittest.TestCase):
+    def test_independent_calls_overlap(self):
+        async def pipeline():
+            return await asyncio.gather(aio.call(slow, "a"), aio.call(slow, "b", delay=0.2))
+
+        start = time.monotonic()
+        self.assertEqual(aio.run_sync(pipeline()), ["a", "b"])
+        # the slowest dependency, not the sum of both
+        self.assertLess(time.monotonic() - start, 0.35)
+
+    def test_call_quietly_returns_default(self):
+        self.assertEqual(aio.run_sync(aio.call_quietly(boom, default=[])), [])
+
+    def test_run_sync_inside_running_loop(self):
+        async def outer():
+            return aio.run_sync(aio.call(slow, 42, delay=0))
+
+        self.assertEqual(asyncio.run(outer()), 42)
+
+    def test_calls_share_one_worker_pool(self):
+        async def pipeline():
+            return await asyncio.gather(
+                aio.call(lambda: threading.current_thread().name),
+                aio.call(lambda: threading.current_thread().name),
+            )
+
+        before = threading.active_count()
+        for _ in range(5):
+            names = aio.run_sync(pipeline())
+            self.assertTrue(all(name.startswith("aio") for name in names), names)
+        # no per-request default executors left behind
+        self.assertLessEqual(threading.active_count(), before + aio.AIO_MAX_WORKERS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from shared.cache import TTLCache
+from shared.db import raw_connection
+from shared.migrations import create_cache_table
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        # Each test gets its own throwaway database file
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        conn = raw_connection(self.db_path)
+        for table in ("test_cache", "recipe_cache"):
+            create_cache_table(conn, table)
+        conn.commit()
+        conn.close()
+        self.cache = TTLCache("test_cache", ttl_seconds=60, memory_size=2, db_path=self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("austin|thai|2|cozy"))
+        self.cache.set("austin|thai|2|cozy", [{"name": "Taco Place"}])
+        self.assertEqual(self.cache.get("austin|thai|2|cozy"), [{"name": "Taco Place"}])
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_get_returns_a_copy(self):
+        self.cache.set("k", [{"name": "Taco Place", "coordinates": {}}])
+        first = self.cache.get("k")
+        del first[0]["coordinates"]
+        self.assertIn("coordinates", self.cache.get("k")[0])
+
+    def test_entries_survive_in_database(self):
+        self.cache.set("k", {"value": 1})
+        fresh = TTLCache("test_cache", ttl_seconds=60, db_path=self.db_path)
+        self.assertEqual(fresh.get("k"), {"value": 1})
+        self.assertEqual(fresh.stats()["memory_hits"], 0)
+
+    def test_memory_lru_is_bounded(self):
+        for key in ["a", "b", "c"]:
+            self.cache.set(key, key)
+        self.assertEqual(self.cache.stats()["memory_entries"], 2)
+        # evicted from memory but still served from the database
+        self.assertEqual(self.cache.get("a"), "a")
+
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache("test_cache", ttl_seconds=0.01, db_path=self.db_path)
+        cache.set("k", "v")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.purge_expired(), 1)
+
+    def test_max_rows_evicts_least_recently_read(self):
+        cache = TTLCache("recipe_cache", ttl_seconds=60, memory_size=1,
+                         db_path=self.db_path, max_rows=2)
+        cache.set("1", {"id": 1})
+        time.sleep(0.01)
+        cache.set("2", {"id": 2})
+        time.sleep(0.01)
+        # reading recipe 1 from the database makes recipe 2 the eviction victim
+        self.assertEqual(cache.get("1"), {"id": 1})
+        cache.set("3", {"id": 3})
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get("2"))
+        self.assertEqual(cache.get("1"), {"id": 1})
+
+    def test_key_hot_in_memory_survives_eviction(self):
+        cache = TTLCache("recipe_cache", ttl_seconds=60, memory_size=10,
+                         db_path=self.db_path, max_rows=2, touch_interval=0)
+        cache.set("1", {"id": 1})
+        time.sleep(0.01)
+        cache.set("2", {"id": 2})
+        time.sleep(0.01)
+        # served from memory, but still recorded as a read
+        self.assertEqual(cache.get("1"), {"id": 1})
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+        cache.set("3", {"id": 3})
+
+        # a fresh process only has the table to go on
+        fresh = TTLCache("recipe_cache", ttl_seconds=60, db_path=self.db_path)
+        self.assertEqual(fresh.get("1"), {"id": 1})
+        self.assertIsNone(fresh.get("2"))
+
+    def test_memory_hits_touch_the_table_at_most_once_per_interval(self):
+        cache = TTLCache("recipe_cache", ttl_seconds=60, db_path=self.db_path,
+                         max_rows=10, touch_interval=60)
+        cache.set("1", {"id": 1})
+        with patch.object(cache, "_touch") as touch:
+            for _ in range(5):
+                cache.get("1")
+        touch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from FoodiesRN import run_foodiesrn
+from shared import migrations
+from shared.cache import TTLCache
+from shared.migrations import run_migrations
+
+
+def make_candidates(count):
+    return [
+        {"name": f"R{i}", "location": f"{i} Main St", "rating": 4.5}
+        for i in range(count)
+    ]
+
+
+class TestCandidatePoolReroll(unittest.TestCase):
+    def setUp(self):
+        # the pool lives in a throwaway database file, never ./preprn.db
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, db_path)
+        run_migrations(db_path)
+        self.addCleanup(migrations._migrated_paths.discard, db_path)
+        pool_cache = TTLCache("foodies_candidate_pool", ttl_seconds=60, db_path=db_path)
+
+        patches = [
+            patch.object(run_foodiesrn, "candidate_pool_cache", pool_cache),
+            patch.object(run_foodiesrn, "finalize_recommendations",
+                         side_effect=lambda picks, user_input, user_id: picks),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.user_input = {"location": "Austin", "cuisine": "thai", "vibe": "cozy"}
+
+    def names(self, picks):
+        return {r["name"] for r in picks}
+
+    def test_reroll_skips_shown_candidates(self):
+        candidates = make_candidates(6)
+        pool_id = run_foodiesrn.save_candidate_pool(self.user_input, 1, candidates, candidates[:3])
+
+        picks = run_foodiesrn.reroll_recommendations(pool_id, 1)
+        self.assertEqual(self.names(picks), {"R3", "R4", "R5"})
+
+    def test_reroll_starts_over_when_pool_is_used_up(self):
+        candidates = make_candidates(3)
+        pool_id = run_foodiesrn.save_candidate_pool(self.user_input, 1, candidates, candidates)
+
+        self.assertEqual(len(run_foodiesrn.reroll_recommendations(pool_id, 1)), 3)
+
+    def test_reroll_rejects_unknown_pool_or_other_user(self):
+        pool_id = run_foodiesrn.save_candidate_pool(self.user_input, 1, make_candidates(4), [])
+
+        self.assertIsNone(run_foodiesrn.reroll_recommendations(pool_id, 2))
+        self.assertIsNone(run_foodiesrn.reroll_recommendations("missing", 1))
+        self.assertIsNone(run_foodiesrn.reroll_recommendations(None, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from shared.circuit import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("upstream down")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4,
+                                      open_seconds=30, clock=self.clock)
+
+    def trip(self):
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(fail)
+
+    def test_opens_after_failure_rate_and_rejects_fast(self):
+        self.breaker.call(lambda: "ok")
+        self.breaker.call(lambda: "ok")
+        self.assertEqual(self.breaker.state, "closed")
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(fail)
+        # 2 failures out of 4 calls reaches the 50% failure rate
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: "never called")
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_half_open_trial_closes_on_success(self):
+        self.trip()
+        self.clock.now = 31
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_trial_failure_reopens(self):
+        self.trip()
+        self.clock.now = 31
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.available())
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker("slow", min_calls=2, slow_call_seconds=1, clock=self.clock)
+        for _ in range(2):
+            breaker.record(True, duration=5)
+        self.assertEqual(breaker.state, "open")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import threading
+import unittest
+from sqlalchemy import text
+from shared.db import get_engine, raw_connection
+
+
+class TestSharedDb(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "test.db")
+
+    def test_one_engine_per_path(self):
+        self.assertIs(get_engine(self.path), get_engine(self.path))
+
+    def test_pragmas_applied(self):
+        with get_engine(self.path).connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 5000)
+
+    def test_raw_connection_is_sqlite3_style_and_pooled(self):
+        conn = raw_connection(self.path)
+        cur = conn.cursor()
+        cur.execute("CREATE TABLE t (x INTEGER)")
+        cur.execute("INSERT INTO t VALUES (?)", (1,))
+        conn.commit()
+        first = conn.dbapi_connection
+        conn.close()
+
+        conn = raw_connection(self.path)
+        self.assertIs(conn.dbapi_connection, first)
+        self.assertEqual(conn.execute("SELECT x FROM t").fetchone(), (1,))
+        conn.close()
+
+    def test_usable_from_other_threads(self):
+        conn = raw_connection(self.path)
+        conn.close()
+        errors = []
+
+        def worker():
+            try:
+                c = raw_connection(self.path)
+                c.execute("SELECT 1").fetchone()
+                c.close()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
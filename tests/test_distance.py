@@ -0,0 +1,44 @@
+import math
+import unittest
+from FoodiesRN.distance import (
+    haversine_distances,
+    apply_straight_line_distances,
+    prefilter_by_straight_line,
+    METERS_PER_MILE,
+)
+
+
+class TestHaversine(unittest.TestCase):
+    def test_matches_scalar_formula(self):
+        # Austin -> Dallas is about 182 miles in a straight line
+        meters, miles = haversine_distances(30.2672, -97.7431, [32.7767], [-96.7970])
+        self.assertAlmostEqual(miles[0], meters[0] / METERS_PER_MILE)
+        self.assertTrue(180 < miles[0] < 185)
+
+    def test_zero_distance(self):
+        meters, _ = haversine_distances(30.0, -97.0, [30.0, 30.0], [-97.0, -97.0])
+        self.assertEqual(list(meters), [0.0, 0.0])
+
+    def test_apply_skips_restaurants_without_coordinates(self):
+        restaurants = [
+            {"name": "Near", "coordinates": {"latitude": 30.01, "longitude": -97.0}},
+            {"name": "No coords", "coordinates": {}},
+        ]
+        apply_straight_line_distances(30.0, -97.0, restaurants)
+        self.assertTrue(math.isclose(restaurants[0]["distance_meters"], 1111.95, rel_tol=1e-3))
+        self.assertIsNone(restaurants[0]["driving_distance_miles"])
+        self.assertNotIn("distance_meters", restaurants[1])
+
+
+    def test_prefilter_drops_candidates_outside_radius(self):
+        restaurants = [
+            {"name": "Near", "coordinates": {"latitude": 30.01, "longitude": -97.0}},
+            {"name": "Far", "coordinates": {"latitude": 31.0, "longitude": -97.0}},
+            {"name": "No coords"},
+        ]
+        kept = prefilter_by_straight_line(30.0, -97.0, restaurants, radius_miles=5)
+        self.assertEqual([r["name"] for r in kept], ["Near"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from genai_utils import GenAIExecutor, get_genai_model, parse_indexed_json, text_cache_key
+
+
+class TestGenAIExecutor(unittest.TestCase):
+    def test_batch_results_in_order(self):
+        executor = GenAIExecutor(workers=2, queue_size=8)
+        results = executor.run_batch([(str.upper, ("a",)), (str.upper, ("b",))], timeout=1)
+        self.assertEqual(results, ["A", "B"])
+        self.assertEqual(executor.stats()["completed"], 2)
+
+    def test_slow_calls_miss_the_deadline(self):
+        executor = GenAIExecutor(workers=2, queue_size=8)
+        start = time.monotonic()
+        results = executor.run_batch([(time.sleep, (0.5,)), (str.upper, ("b",))], timeout=0.1)
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(results, [None, "B"])
+        self.assertEqual(executor.stats()["timeouts"], 1)
+
+    def test_full_queue_sheds_load(self):
+        executor = GenAIExecutor(workers=1, queue_size=1)
+        release = threading.Event()
+        executor.submit(release.wait)
+        time.sleep(0.05)  # let the worker pick up the blocking call
+        self.assertIsNotNone(executor.submit(str.upper, "queued"))
+        self.assertIsNone(executor.submit(str.upper, "shed"))
+        stats = executor.stats()
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["in_flight"], 1)
+        self.assertEqual(stats["queue_depth"], 1)
+        release.set()
+
+    def test_thread_count_is_fixed(self):
+        executor = GenAIExecutor(workers=3, queue_size=4)
+        before = threading.active_count()
+        for _ in range(5):
+            executor.run_batch([(time.sleep, (0.01,))] * 4, timeout=0.001)
+        self.assertLessEqual(threading.active_count() - before, 3)
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_model_is_built_once_per_key_and_name(self):
+        first = get_genai_model("test-key", "gemini-1.5-flash")
+        self.assertIs(get_genai_model("test-key", "gemini-1.5-flash"), first)
+        self.assertIsNot(get_genai_model("test-key", "gemini-1.5-pro"), first)
+        self.assertIsNot(get_genai_model("other-key", "gemini-1.5-flash"), first)
+
+    def test_switching_keys_reconfigures_and_rebuilds_handles(self):
+        with patch("genai_utils.genai.configure") as configure:
+            first = get_genai_model("key-a", "gemini-1.5-flash")
+            get_genai_model("key-a", "gemini-1.5-pro")
+            get_genai_model("key-b", "gemini-1.5-flash")
+            # key-a's old handle would now talk through key-b's client
+            self.assertIsNot(get_genai_model("key-a", "gemini-1.5-flash"), first)
+        self.assertEqual([c.kwargs["api_key"] for c in configure.call_args_list],
+                         ["key-a", "key-b", "key-a"])
+
+
+class TestParseIndexedJson(unittest.TestCase):
+    def test_maps_entries_by_index(self):
+        text = '[{"index": 2, "text": "Second"}, {"index": 1, "text": "First"}]'
+        self.assertEqual(parse_indexed_json(text, 2), ["First", "Second"])
+
+    def test_gaps_and_bad_entries_become_none(self):
+        text = '[{"index": 1, "text": "  "}, {"index": 7, "text": "Out of range"}, {"index": 3, "text": "Third"}]'
+        self.assertEqual(parse_indexed_json(text, 3), [None, None, "Third"])
+
+    def test_accepts_fenced_plain_list(self):
+        text = '```json\n["One", "Two"]\n```'
+        self.assertEqual(parse_indexed_json(text, 3), ["One", "Two", None])
+
+    def test_invalid_json(self):
+        self.assertEqual(parse_indexed_json("1. One\n\n2. Two", 2), [None, None])
+
+
+class TestTextCacheKey(unittest.TestCase):
+    def test_normalizes_parts_and_keeps_version(self):
+        self.assertEqual(text_cache_key("v1", " Pad  Thai ", "Cozy"), text_cache_key("v1", "pad thai", "cozy"))
+        self.assertNotEqual(text_cache_key("v1", "Pad Thai"), text_cache_key("v2", "Pad Thai"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from FoodiesRN import run_foodiesrn
+from shared.circuit import CircuitBreaker
+
+from fakes import DictCache
+
+USER = (30.2672, -97.7431)
+
+
+def make_restaurants(count):
+    return [
+        {"name": f"R{i}", "coordinates": {"latitude": 30.27 + i * 0.01, "longitude": -97.74}}
+        for i in range(count)
+    ]
+
+
+class GeoapifyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.failing = set()
+        self._lock = threading.Lock()
+        patches = [
+            patch.object(run_foodiesrn, "GEOAPIFY_KEY", "test-key"),
+            patch.object(run_foodiesrn, "GEOAPIFY_CHUNK_SIZE", 2),
+            patch.object(run_foodiesrn, "route_cache", DictCache()),
+            patch.object(run_foodiesrn, "geoapify", SimpleNamespace(breaker=CircuitBreaker("geoapify-test"))),
+            patch.object(run_foodiesrn, "_request_route_matrix", side_effect=self.fake_matrix),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def fake_matrix(self, user_lat, user_lng, restaurants):
+        names = [r["name"] for r in restaurants]
+        with self._lock:
+            self.calls.append(names)
+        if self.failing & set(names):
+            raise RuntimeError("geoapify 503")
+        # 1 km and 2 minutes per restaurant index, so results are easy to check
+        return [{"distance": 1000.0 * (int(n[1:]) + 1), "time": 120.0} for n in names]
+
+
+class TestChunkedRouteMatrix(GeoapifyTestCase):
+    def test_failing_chunk_only_falls_back_for_its_own_restaurants(self):
+        restaurants = make_restaurants(5)
+        self.failing = {"R2"}  # second chunk is R2, R3
+
+        run_foodiesrn.calculate_distances_with_geoapify(*USER, restaurants)
+
+        self.assertEqual(sorted(self.calls), [["R0", "R1"], ["R2", "R3"], ["R4"]])
+        by_name = {r["name"]: r for r in restaurants}
+        for name in ("R0", "R1", "R4"):
+            self.assertIsNotNone(by_name[name]["driving_distance_miles"], name)
+            self.assertAlmostEqual(by_name[name]["driving_duration_minutes"], 2.0)
+        for name in ("R2", "R3"):
+            self.assertIsNone(by_name[name]["driving_distance_miles"], name)
+            self.assertGreater(by_name[name]["distance_meters"], 0)
+
+
+class TestRouteCache(GeoapifyTestCase):
+    def test_repeat_search_from_same_cell_makes_no_geoapify_call(self):
+        run_foodiesrn.calculate_distances_with_geoapify(*USER, make_restaurants(3))
+        self.assertEqual(len(self.calls), 2)
+
+        # a few meters away, still inside the same origin grid cell
+        nearby = (USER[0] + 0.0001, USER[1] + 0.0001)
+        self.assertEqual(run_foodiesrn.snap_origin(*nearby), run_foodiesrn.snap_origin(*USER))
+        restaurants = make_restaurants(3)
+        run_foodiesrn.calculate_distances_with_geoapify(*nearby, restaurants)
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual([r["driving_distance_miles"] is not None for r in restaurants], [True] * 3)
+
+    def test_other_cell_is_routed_again(self):
+        run_foodiesrn.calculate_distances_with_geoapify(*USER, make_restaurants(1))
+        run_foodiesrn.calculate_distances_with_geoapify(USER[0] + 0.05, USER[1], make_restaurants(1))
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
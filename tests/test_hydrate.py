@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from shared import migrations
+from shared.hydrate import hydrate_meals, hydrate_restaurants, meal_status, restaurant_status
+from shared.migrations import run_migrations
+
+
+class TestHydrate(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "test.db")
+        run_migrations(self.path)
+        self.addCleanup(migrations._migrated_paths.discard, self.path)
+
+        conn = sqlite3.connect(self.path)
+        conn.executemany(
+            "INSERT INTO foodiesrn_recommendations (user_id, yelp_id, name, location, loved, notes) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (1, "a1", "Thai Chain", "1 Main St", 1, "get the curry"),
+                (1, "a2", "Thai Chain", "9 Oak Ave", 0, ""),
+                (1, None, "Old Diner", "5 Elm St", 1, ""),  # saved before yelp ids
+                (2, "b1", "Taco Spot", "3 Pine St", 1, "someone else's"),
+            ],
+        )
+        conn.execute("INSERT INTO requests (id, user_id, budget, servings) VALUES (1, 1, 20, 2)")
+        conn.executemany(
+            "INSERT INTO meals (request_id, title, source_url, loved, notes) VALUES (?, ?, ?, ?, ?)",
+            [
+                (1, "Pad Thai", "https://r.example/pad-thai", 0, "less sugar"),
+                (1, "Pad Thai", "https://r.example/pad-thai", 1, ""),
+                (1, "Soup", "https://r.example/soup", 0, ""),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def test_restaurants_match_on_yelp_id_then_name_and_location(self):
+        restaurants = [
+            {"yelp_id": "a1", "name": "Thai Chain", "location": "1 Main St"},
+            {"yelp_id": "a2", "name": "Thai Chain", "location": "9 Oak Ave"},
+            {"yelp_id": "zz", "name": "Old Diner", "location": "5 Elm St"},
+            {"yelp_id": "b1", "name": "Taco Spot", "location": "3 Pine St"},
+        ]
+        statuses = restaurant_status(restaurants, 1, db_path=self.path)
+        self.assertEqual(statuses, [
+            {"saved": True, "loved": True, "notes": "get the curry"},
+            {"saved": True, "loved": False, "notes": ""},
+            {"saved": True, "loved": True, "notes": ""},
+            {"saved": False, "loved": False, "notes": ""},
+        ])
+
+    def test_meals_merge_repeat_saves(self):
+        meals = [
+            {"title": "Pad Thai", "source_url": "https://r.example/pad-thai"},
+            {"title": "Soup", "source_url": "https://r.example/soup"},
+            {"title": "Salad", "source_url": "https://r.example/salad"},
+        ]
+        hydrate_meals(meals, 1, db_path=self.path)
+        self.assertEqual([(m["saved"], m["loved"], m["notes"]) for m in meals], [
+            (True, True, "less sugar"),
+            (True, False, ""),
+            (False, False, ""),
+        ])
+
+    def test_empty_list_or_no_user_skips_the_database(self):
+        self.assertEqual(hydrate_restaurants([], 1, db_path="/nonexistent/dir/x.db"), [])
+        self.assertEqual(meal_status([{"title": "Soup"}], None, db_path="/nonexistent/dir/x.db"),
+                         [{"saved": False, "loved": False, "notes": ""}])
+
+
+if __name__ == '__main__':
+    unittest.main()
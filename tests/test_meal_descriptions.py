@@ -0,0 +1,90 @@
+import json
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from prepngo import PrepnGo
+from shared.circuit import CircuitBreaker
+
+from fakes import DictCache
+
+
+def make_meals(*titles):
+    return [{"title": title, "summary": ""} for title in titles]
+
+
+class TestBatchedMealDescriptions(unittest.TestCase):
+    def setUp(self):
+        self.prompts = []
+        self.answer = "[]"
+        self.delay = 0
+        patches = [
+            patch.object(PrepnGo, "GOOGLE_API_KEY", "test-key"),
+            patch.object(PrepnGo, "GENAI_BATCH_DESCRIPTIONS", True),
+            patch.object(PrepnGo, "genai_text_cache", DictCache()),
+            patch.object(PrepnGo, "genai_breaker", CircuitBreaker("genai-test")),
+            patch.object(PrepnGo, "get_genai_model", return_value=object()),
+            patch.object(PrepnGo, "genai_generate", side_effect=self.fake_generate),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def fake_generate(self, model, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        return SimpleNamespace(text=self.answer)
+
+    def test_one_prompt_parsed_by_index(self):
+        self.answer = json.dumps([
+            {"index": 2, "text": "Silky noodles."},
+            {"index": 1, "text": "Crispy tacos."},
+        ])
+        meals = make_meals("Tacos", "Noodles")
+        PrepnGo._describe_meals(meals, timeout=2.0)
+
+        self.assertEqual(len(self.prompts), 1)
+        self.assertEqual([m["summary"] for m in meals], ["Crispy tacos.", "Silky noodles."])
+        self.assertEqual([m["summary_source"] for m in meals], ["ai", "ai"])
+
+    def test_missing_or_invalid_index_falls_back_to_template(self):
+        self.answer = json.dumps([
+            {"index": 1, "text": "Crispy tacos."},
+            {"index": 7, "text": "No such meal."},
+            {"index": "two", "text": "Not a number."},
+        ])
+        meals = make_meals("Tacos", "Noodles", "Soup")
+        PrepnGo._describe_meals(meals, timeout=2.0)
+
+        self.assertEqual(meals[0]["summary"], "Crispy tacos.")
+        self.assertEqual(meals[0]["summary_source"], "ai")
+        for meal in meals[1:]:
+            self.assertEqual(meal["summary_source"], "template")
+            self.assertIn(meal["summary"], PrepnGo.MEAL_DESCRIPTIONS)
+
+    def test_expired_deadline_uses_templates(self):
+        self.answer = json.dumps(["Crispy tacos.", "Silky noodles."])
+        self.delay = 0.5
+        meals = make_meals("Tacos", "Noodles")
+
+        start = time.monotonic()
+        PrepnGo._describe_meals(meals, timeout=0.1)
+
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual([m["summary_source"] for m in meals], ["template", "template"])
+        self.assertTrue(all(m["summary"] in PrepnGo.MEAL_DESCRIPTIONS for m in meals))
+
+    def test_cached_descriptions_skip_the_model(self):
+        PrepnGo.genai_text_cache.set(PrepnGo._description_cache_key("Tacos"), "From the cache.")
+        meals = make_meals("Tacos")
+        PrepnGo._describe_meals(meals, timeout=2.0)
+
+        self.assertEqual(self.prompts, [])
+        self.assertEqual(meals[0]["summary"], "From the cache.")
+        self.assertEqual(meals[0]["summary_source"], "ai")
+
+
+if __name__ == '__main__':
+    unittest.main()
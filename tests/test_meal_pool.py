@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from prepngo import PrepnGo
+from shared import migrations
+from shared.cache import TTLCache
+from shared.migrations import run_migrations
+from shared.ratelimit import TokenBucket
+
+
+def make_meals(count):
+    return [
+        {"title": f"Meal {i}", "price": 2.5, "diets": [], "summary": "", "source_url": ""}
+        for i in range(count)
+    ]
+
+
+class TestMealPoolPaging(unittest.TestCase):
+    def setUp(self):
+        self.user_input = {
+            "budget": "50",
+            "servings": "2",
+            "diets": [],
+            "meal_type": "dinner",
+            "location": "Austin, TX",
+            "grocery": "yes",
+            "pantry": [],
+        }
+        # the pool and description caches live in a throwaway database file,
+        # never ./preprn.db
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, db_path)
+        run_migrations(db_path)
+        self.addCleanup(migrations._migrated_paths.discard, db_path)
+
+        patches = [
+            patch.object(PrepnGo, "spoon_limiter",
+                         TokenBucket(rate_per_second=100, burst=10, daily_limit=150,
+                                     name="spoonacular", db_path=db_path)),
+            patch.object(PrepnGo, "meal_pool_cache",
+                         TTLCache("prepngo_meal_pool", ttl_seconds=60, db_path=db_path)),
+            patch.object(PrepnGo, "genai_text_cache",
+                         TTLCache("genai_text_cache", ttl_seconds=60, db_path=db_path)),
+            patch.object(PrepnGo, "GOOGLE_API_KEY", None),
+            patch.object(PrepnGo, "get_random_meal_plan",
+                         side_effect=lambda budget, servings, tags, number=3: make_meals(min(number, 7))),
+        ]
+        for p in patches:
+            self.mock = p.start()
+            self.addCleanup(p.stop)
+
+    def test_pool_is_fetched_once_and_paged(self):
+        first = PrepnGo.main(self.user_input, 1)
+        self.assertEqual([m["title"] for m in first["meals"]], ["Meal 0", "Meal 1", "Meal 2"])
+        self.assertTrue(first["has_more"])
+
+        second = PrepnGo.more_meals(first["pool_id"], 1)
+        self.assertEqual([m["title"] for m in second["meals"]], ["Meal 3", "Meal 4", "Meal 5"])
+        self.assertTrue(all(m["meal_type"] == "dinner" and m["summary"] for m in second["meals"]))
+        self.assertEqual(second["stores"], first["stores"])
+
+        last = PrepnGo.more_meals(first["pool_id"], 1)
+        self.assertEqual([m["title"] for m in last["meals"]], ["Meal 6"])
+        self.assertFalse(last["has_more"])
+        self.assertIsNone(PrepnGo.more_meals(first["pool_id"], 1))
+
+        # one Spoonacular search for all three pages
+        self.assertEqual(self.mock.call_count, 1)
+
+    def test_pantry_recipes_fetched_only_for_pages_shown(self):
+        fetched = []
+
+        def recipe_info(ids):
+            fetched.append(list(ids))
+            return [{"title": f"Recipe {i}", "sourceUrl": f"https://r.example/{i}"} for i in ids]
+
+        pantry_input = dict(self.user_input, grocery="no", pantry=["rice"])
+        with patch.object(PrepnGo, "find_by_ingredients",
+                          return_value=[{"id": i, "title": f"Recipe {i}"} for i in range(7)]), \
+             patch.object(PrepnGo, "get_recipe_information_many", side_effect=recipe_info):
+            first = PrepnGo.main(pantry_input, 1)
+            self.assertEqual(fetched, [[0, 1, 2]])
+
+            PrepnGo.more_meals(first["pool_id"], 1)
+            self.assertEqual(fetched, [[0, 1, 2], [3, 4, 5]])
+
+    def test_meals_dropped_by_the_daily_quota_come_with_a_notice(self):
+        pantry_input = dict(self.user_input, grocery="no", pantry=["rice"])
+        with patch.object(PrepnGo, "find_by_ingredients",
+                          return_value=[{"id": i, "title": f"Recipe {i}"} for i in range(3)]), \
+             patch.object(PrepnGo, "get_recipe_information_many",
+                          return_value=[{"title": "Recipe 0", "sourceUrl": ""}, None, None]), \
+             patch.object(PrepnGo, "spoon_limiter",
+                          TokenBucket(rate_per_second=1, daily_limit=0)):
+            result = PrepnGo.main(pantry_input, 1)
+        self.assertEqual([m["title"] for m in result["meals"]], ["Recipe 0"])
+        self.assertEqual(result["notice"], PrepnGo.SPOON_QUOTA_NOTICE)
+
+    def test_unknown_pool(self):
+        self.assertIsNone(PrepnGo.more_meals("missing", 1))
+        self.assertIsNone(PrepnGo.more_meals(None, 1))
+
+    def test_pool_of_another_user_is_rejected(self):
+        first = PrepnGo.main(self.user_input, 1)
+        self.assertIsNone(PrepnGo.more_meals(first["pool_id"], 2))
+        # the owner can still page through it
+        self.assertEqual(len(PrepnGo.more_meals(first["pool_id"], 1)["meals"]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
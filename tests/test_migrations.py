@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from shared import migrations
+from shared.migrations import CACHE_TABLES, MIGRATIONS, run_migrations
+
+
+class MigrationsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+
+    def tearDown(self):
+        migrations._migrated_paths.discard(self.path)
+        self.tmp.cleanup()
+
+    def _columns(self, table):
+        conn = sqlite3.connect(self.path)
+        try:
+            return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        finally:
+            conn.close()
+
+    def test_fresh_database_gets_every_table(self):
+        version = run_migrations(self.path)
+        self.assertEqual(version, MIGRATIONS[-1][0])
+
+        conn = sqlite3.connect(self.path)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        applied = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        conn.close()
+
+        for table in ("users", "pantry_items", "user_profile", "foodiesrn_recommendations",
+                      "requests", "meals", "feedback", "local_stores", "rate_limit_usage"):
+            self.assertIn(table, tables)
+        self.assertEqual(applied, [m[0] for m in MIGRATIONS])
+        self.assertIn("latitude", self._columns("foodiesrn_recommendations"))
+        self.assertIn("notes", self._columns("meals"))
+        for table in CACHE_TABLES:
+            self.assertIn("accessed_at", self._columns(table))
+
+    def test_upgrades_database_created_before_the_runner(self):
+        # a database from before the notes/coordinates columns existed
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE foodiesrn_recommendations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "name TEXT NOT NULL, location TEXT, user_id INTEGER, loved BOOLEAN DEFAULT FALSE)")
+        conn.execute("INSERT INTO foodiesrn_recommendations (name, loved) VALUES ('Tacos', 1)")
+        conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY AUTOINCREMENT, request_id INTEGER NOT NULL, "
+                     "title TEXT, loved INTEGER DEFAULT 0)")
+        # a cache table the cache created for itself before it tracked reads
+        conn.execute("CREATE TABLE genai_text_cache (cache_key TEXT PRIMARY KEY, "
+                     "payload TEXT NOT NULL, expires_at REAL NOT NULL)")
+        conn.commit()
+        conn.close()
+
+        run_migrations(self.path)
+
+        columns = self._columns("foodiesrn_recommendations")
+        for column in ("notes", "latitude", "longitude", "driving_distance_miles"):
+            self.assertIn(column, columns)
+        self.assertIn("meal_type", self._columns("meals"))
+        self.assertIn("accessed_at", self._columns("genai_text_cache"))
+
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(conn.execute("SELECT name, loved FROM foodiesrn_recommendations").fetchall(), [("Tacos", 1)])
+        conn.close()
+
+    def test_duplicate_restaurant_saves_are_collapsed(self):
+        run_migrations(self.path)
+        conn = sqlite3.connect(self.path)
+        conn.executemany(
+            "INSERT INTO foodiesrn_recommendations (id, yelp_id, name, location, user_id, loved) "
+            "VALUES (?, ?, 'Old Diner', '5 Elm St', ?, ?)",
+            [(1, None, 1, 1), (2, None, 1, 0), (3, None, 1, 0), (4, "abc", 1, 0),
+             (5, None, 2, 0), (6, None, 2, 1)])
+        conn.execute("DELETE FROM schema_version WHERE version >= 9")
+        conn.commit()
+        conn.close()
+
+        migrations._migrated_paths.discard(self.path)
+        run_migrations(self.path)
+
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute("SELECT id, yelp_id, user_id, loved FROM foodiesrn_recommendations ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual(rows, [(4, "abc", 1, 1), (5, None, 2, 1)])
+
+    def test_runs_each_migration_once(self):
+        run_migrations(self.path)
+        # a second process finds everything applied
+        migrations._migrated_paths.discard(self.path)
+        run_migrations(self.path)
+
+        conn = sqlite3.connect(self.path)
+        count = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, len(MIGRATIONS))
+
+
+if __name__ == "__main__":
+    unittest.main()
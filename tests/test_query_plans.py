@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from shared import migrations
+from shared.migrations import run_migrations
+
+# the per-user queries the routes run on every request, with dummy parameters
+HOT_QUERIES = {
+    "saved restaurants": (
+        "SELECT name, location, loved FROM foodiesrn_recommendations WHERE user_id = ?", (1,)),
+    "restaurant by name": (
+        "SELECT 1 FROM foodiesrn_recommendations WHERE user_id = ? AND name = ?", (1, "x")),
+    "restaurant by name and location": (
+        "SELECT loved, notes FROM foodiesrn_recommendations "
+        "WHERE user_id = ? AND name = ? AND location = ?", (1, "x", "y")),
+    "loved restaurants": (
+        "SELECT name, location FROM foodiesrn_recommendations WHERE user_id = ? AND loved = TRUE", (1,)),
+    "saved meals": (
+        "SELECT meals.title, meals.price, meals.summary, meals.source_url, meals.loved "
+        "FROM meals JOIN requests ON meals.request_id = requests.id "
+        "WHERE requests.user_id = ? ORDER BY meals.id DESC", (1,)),
+    "loved meals": (
+        "SELECT meals.title FROM meals JOIN requests ON meals.request_id = requests.id "
+        "WHERE requests.user_id = ? AND meals.loved = 1 ORDER BY meals.id DESC", (1,)),
+    "meal by title and url": (
+        "SELECT meals.id, meals.loved FROM meals JOIN requests ON meals.request_id = requests.id "
+        "WHERE requests.user_id = ? AND meals.title = ? AND meals.source_url = ?", (1, "x", "y")),
+    "meal notes": (
+        "SELECT notes FROM meals WHERE title = ? AND request_id IN "
+        "(SELECT id FROM requests WHERE user_id = ?)", ("x", 1)),
+    "restaurant status": (
+        "SELECT yelp_id, name, location, loved, notes FROM foodiesrn_recommendations "
+        "WHERE user_id = ? AND (yelp_id IN (?, ?) OR name IN (?, ?))", (1, "a", "b", "x", "y")),
+    "meal status": (
+        "SELECT meals.title, meals.source_url, meals.loved, meals.notes FROM meals "
+        "JOIN requests ON meals.request_id = requests.id "
+        "WHERE requests.user_id = ? AND meals.title IN (?, ?)", (1, "x", "y")),
+    "pantry items": (
+        "SELECT item FROM pantry_items WHERE user_id = ? ORDER BY item", (1,)),
+    "pantry item": (
+        "SELECT 1 FROM pantry_items WHERE user_id = ? AND item = ?", (1, "x")),
+}
+
+
+class QueryPlanTest(unittest.TestCase):
+    """None of the per-user queries may fall back to a full table scan."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        run_migrations(self.path)
+        self.conn = sqlite3.connect(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        migrations._migrated_paths.discard(self.path)
+        self.tmp.cleanup()
+
+    def test_hot_queries_use_indexes(self):
+        for name, (sql, params) in HOT_QUERIES.items():
+            with self.subTest(query=name):
+                plan = [row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                scans = [step for step in plan if step.startswith("SCAN ")]
+                self.assertEqual(scans, [], f"{name}: {plan}")
+
+
+if __name__ == "__main__":
+    unittest.main()
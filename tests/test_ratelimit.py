@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+import unittest
+from shared import migrations
+from shared.migrations import run_migrations
+from shared.ratelimit import TokenBucket, RateLimitExceeded
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_immediate(self):
+        bucket = TokenBucket(rate_per_second=1, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_refill_rate_is_respected(self):
+        bucket = TokenBucket(rate_per_second=20, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # two tokens up front, two more at 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertEqual(bucket.stats()["waits"], 2)
+
+    def test_daily_limit(self):
+        bucket = TokenBucket(rate_per_second=100, burst=10, daily_limit=3)
+        for _ in range(3):
+            bucket.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            bucket.acquire()
+
+    def test_timeout(self):
+        bucket = TokenBucket(rate_per_second=0.1, burst=1)
+        bucket.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            bucket.acquire(timeout=0.05)
+
+    def test_daily_quota_spent(self):
+        bucket = TokenBucket(rate_per_second=100, burst=10, daily_limit=2)
+        bucket.acquire()
+        self.assertFalse(bucket.daily_quota_spent())
+        bucket.acquire()
+        self.assertTrue(bucket.daily_quota_spent())
+
+
+class TestPersistedDailyLimit(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, self.db_path)
+        run_migrations(self.db_path)
+        self.addCleanup(migrations._migrated_paths.discard, self.db_path)
+
+    def make_bucket(self):
+        return TokenBucket(rate_per_second=100, burst=10, daily_limit=3,
+                           name="spoonacular", db_path=self.db_path)
+
+    def test_workers_share_one_daily_quota(self):
+        first, second = self.make_bucket(), self.make_bucket()
+        first.acquire()
+        first.acquire()
+        second.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            second.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            first.acquire()
+        self.assertTrue(first.daily_quota_spent())
+
+    def test_usage_survives_a_restart(self):
+        self.make_bucket().acquire(cost=3)
+        restarted = self.make_bucket()
+        self.assertTrue(restarted.daily_quota_spent())
+        with self.assertRaises(RateLimitExceeded):
+            restarted.acquire()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sqlalchemy as db
+
+from FoodiesRN import run_foodiesrn
+from FoodiesRN.spatial_index import RestaurantIndex
+from shared import migrations
+from shared.db import get_engine
+from shared.migrations import run_migrations
+
+
+def make_result(yelp_id, name, location, rating=4.5):
+    return {
+        "yelp_id": yelp_id, "name": name, "location": location, "price": "$$",
+        "rating": rating, "url": f"https://yelp.example/{yelp_id}", "image_url": "",
+        "user_location": "Austin", "cuisine": "thai", "vibe": "cozy",
+        "distance_meters": None, "driving_distance_miles": None, "driving_duration_minutes": None,
+        "latitude": 30.27, "longitude": -97.74,
+    }
+
+
+class TestSaveToDb(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        path = os.path.join(self.tmpdir.name, "test.db")
+        run_migrations(path)
+        self.addCleanup(migrations._migrated_paths.discard, path)
+
+        self.engine = get_engine(path)
+        for name, value in (("engine", self.engine), ("restaurant_index", RestaurantIndex())):
+            patcher = patch.object(run_foodiesrn, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def rows(self):
+        with self.engine.connect() as connection:
+            return connection.execute(db.text(
+                "SELECT yelp_id, name, location, rating, loved, notes FROM foodiesrn_recommendations ORDER BY yelp_id"
+            )).fetchall()
+
+    def test_branches_of_a_chain_are_kept_apart(self):
+        run_foodiesrn.save_to_db([
+            make_result("a1", "Thai Chain", "1 Main St"),
+            make_result("a2", "Thai Chain", "9 Oak Ave"),
+        ], 1)
+        self.assertEqual([(r.yelp_id, r.location) for r in self.rows()],
+                         [("a1", "1 Main St"), ("a2", "9 Oak Ave")])
+
+    def test_saving_again_refreshes_details_but_keeps_loved_and_notes(self):
+        run_foodiesrn.save_to_db([make_result("a1", "Thai Place", "1 Main St")], 1)
+        with self.engine.connect() as connection:
+            connection.execute(db.text(
+                "UPDATE foodiesrn_recommendations SET loved = TRUE, notes = 'get the curry'"))
+            connection.commit()
+
+        run_foodiesrn.save_to_db([make_result("a1", "Thai Place", "1 Main St", rating=4.0)], 1)
+
+        rows = self.rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].rating, 4.0)
+        self.assertTrue(rows[0].loved)
+        self.assertEqual(rows[0].notes, "get the curry")
+
+    def test_same_business_for_another_user_is_a_new_row(self):
+        run_foodiesrn.save_to_db([make_result("a1", "Thai Place", "1 Main St")], 1)
+        run_foodiesrn.save_to_db([make_result("a1", "Thai Place", "1 Main St")], 2)
+        self.assertEqual(len(self.rows()), 2)
+
+    def test_saving_a_result_without_yelp_id_again_keeps_one_row(self):
+        run_foodiesrn.save_to_db([make_result(None, "Old Diner", "5 Elm St")], 1)
+        run_foodiesrn.save_to_db([make_result(None, "Old Diner", "5 Elm St")], 1)
+        self.assertEqual([(r.yelp_id, r.name) for r in self.rows()], [(None, "Old Diner")])
+
+    def test_legacy_save_is_claimed_when_the_restaurant_has_an_id(self):
+        # a loved row saved before rows carried a yelp_id
+        with self.engine.connect() as connection:
+            connection.execute(db.text(
+                "INSERT INTO foodiesrn_recommendations (name, location, user_id, loved, notes) "
+                "VALUES ('Old Diner', '5 Elm St', 1, TRUE, 'pie')"))
+            connection.commit()
+
+        run_foodiesrn.save_to_db([make_result("abc", "Old Diner", "5 Elm St", rating=4.0)], 1)
+        run_foodiesrn.save_to_db([make_result(None, "Old Diner", "5 Elm St")], 1)
+
+        rows = self.rows()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].yelp_id, "abc")
+        self.assertEqual(rows[0].rating, 4.0)
+        self.assertTrue(rows[0].loved)
+        self.assertEqual(rows[0].notes, "pie")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from FoodiesRN.spatial_index import RestaurantIndex
+
+
+def make_restaurant(name, lat, lng, cuisine="thai"):
+    return {
+        "name": name,
+        "location": f"{name} St",
+        "rating": 4.5,
+        "price": "$$",
+        "url": "",
+        "cuisine": cuisine,
+        "latitude": lat,
+        "longitude": lng,
+    }
+
+
+class TestRestaurantIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RestaurantIndex(cell_degrees=0.05)
+        # Austin downtown, ~1 mile north, ~20 miles away
+        self.index.add_many([
+            make_restaurant("Downtown", 30.2672, -97.7431),
+            make_restaurant("North", 30.2817, -97.7431),
+            make_restaurant("Far", 30.5500, -97.7431, cuisine="mexican"),
+            {"name": "No coords", "location": "?", "cuisine": "thai"},
+        ])
+
+    def test_radius_query_is_sorted_nearest_first(self):
+        results = self.index.query(30.2672, -97.7431, 5)
+        self.assertEqual([r["name"] for r in results], ["Downtown", "North"])
+        self.assertLess(results[0]["distance_meters"], results[1]["distance_meters"])
+
+    def test_cuisine_and_limit(self):
+        self.assertEqual(self.index.query(30.2672, -97.7431, 50, cuisine="Mexican")[0]["name"], "Far")
+        self.assertEqual(len(self.index.query(30.2672, -97.7431, 50, limit=2)), 2)
+
+    def test_duplicates_are_stored_once(self):
+        self.index.add({"name": "North", "location": "North St",
+                        "coordinates": {"latitude": 30.2817, "longitude": -97.7431}})
+        self.assertEqual(len(self.index), 3)
+
+    def test_results_are_copies(self):
+        self.index.query(30.2672, -97.7431, 5)[0]["coordinates"]["latitude"] = 0
+        self.assertEqual(self.index.query(30.2672, -97.7431, 5)[0]["name"], "Downtown")
+
+
+if __name__ == '__main__':
+    unittest.main()
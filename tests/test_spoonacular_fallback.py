@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from prepngo import PrepnGo, spoonacular_utils
+from shared import migrations
+from shared.cache import TTLCache
+from shared.migrations import run_migrations
+from shared.circuit import CircuitBreaker
+from shared.ratelimit import TokenBucket
+
+RANDOM_BODY = {"recipes": [
+    {"title": f"Meal {i}", "pricePerServing": 250, "diets": [], "sourceUrl": f"https://r.example/{i}"}
+    for i in range(4)
+]}
+
+
+def open_breaker():
+    breaker = CircuitBreaker("spoonacular-test", min_calls=1, open_seconds=60)
+    breaker.allow()
+    breaker.record(False)
+    return breaker
+
+
+class TestSpoonacularBreakerFallback(unittest.TestCase):
+    def setUp(self):
+        # every cache lives in a throwaway database file, never ./preprn.db
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.addCleanup(os.remove, db_path)
+        run_migrations(db_path)
+        self.addCleanup(migrations._migrated_paths.discard, db_path)
+
+        limiter = TokenBucket(rate_per_second=100, burst=10, daily_limit=150,
+                              name="spoonacular", db_path=db_path)
+        patches = [
+            patch.object(spoonacular_utils, "spoon_limiter", limiter),
+            patch.object(PrepnGo, "spoon_limiter", limiter),
+            patch.object(spoonacular_utils, "search_fallback_cache",
+                         TTLCache("spoonacular_search_fallback", ttl_seconds=60, db_path=db_path)),
+            patch.object(PrepnGo, "meal_pool_cache",
+                         TTLCache("prepngo_meal_pool", ttl_seconds=60, db_path=db_path)),
+            patch.object(PrepnGo, "genai_text_cache",
+                         TTLCache("genai_text_cache", ttl_seconds=60, db_path=db_path)),
+            patch.object(PrepnGo, "GOOGLE_API_KEY", None),
+            patch.object(spoonacular_utils.spoonacular, "breaker", CircuitBreaker("spoonacular-test")),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def force_open(self):
+        patcher = patch.object(spoonacular_utils.spoonacular, "breaker", open_breaker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_open_breaker_serves_last_cached_search(self):
+        with patch.object(spoonacular_utils, "_spoonacular_get", return_value=RANDOM_BODY):
+            fresh = spoonacular_utils.get_random_meal_plan(20, 2, ["Vegan"], number=4)
+
+        self.force_open()
+        with patch.object(spoonacular_utils.spoonacular.session, "request") as http:
+            cached = spoonacular_utils.get_random_meal_plan(20, 2, ["vegan"], number=12)
+            http.assert_not_called()
+        self.assertEqual(cached, fresh)
+
+    def test_open_breaker_serves_cached_pantry_search(self):
+        found = [{"id": 1, "title": "Rice Bowl"}]
+        with patch.object(spoonacular_utils, "_spoonacular_get", return_value=found):
+            spoonacular_utils.find_by_ingredients(["rice", "Beans"], number=12)
+
+        self.force_open()
+        self.assertEqual(spoonacular_utils.find_by_ingredients(["beans", "rice"], number=12), found)
+
+    def test_spent_quota_serves_cached_search(self):
+        found = [{"id": 1, "title": "Rice Bowl"}]
+        with patch.object(spoonacular_utils, "_spoonacular_get", return_value=found):
+            spoonacular_utils.find_by_ingredients(["rice"], number=12)
+
+        spent = TokenBucket(rate_per_second=1, daily_limit=0)
+        with patch.object(spoonacular_utils, "spoon_limiter", spent), \
+             patch.object(spoonacular_utils.spoonacular.session, "request") as http:
+            self.assertEqual(spoonacular_utils.find_by_ingredients(["rice"], number=12), found)
+            # nothing cached for this one: no meals, not an error
+            self.assertEqual(spoonacular_utils.find_by_ingredients(["tofu"], number=12), [])
+            http.assert_not_called()
+
+    def test_spent_quota_with_nothing_cached_says_so(self):
+        spent = TokenBucket(rate_per_second=1, daily_limit=0)
+        with patch.object(spoonacular_utils, "spoon_limiter", spent), \
+             patch.object(PrepnGo, "spoon_limiter", spent):
+            result = PrepnGo.main({
+                "budget": "20", "servings": "2", "diets": [], "meal_type": "dinner",
+                "location": "Austin, TX", "grocery": "yes", "pantry": [],
+            })
+        self.assertEqual(result["meals"], [])
+        self.assertEqual(result["notice"], PrepnGo.SPOON_QUOTA_NOTICE)
+
+    def test_open_breaker_with_nothing_cached_degrades(self):
+        self.force_open()
+        result = PrepnGo.main({
+            "budget": "20", "servings": "2", "diets": ["keto"], "meal_type": "dinner",
+            "location": "Austin, TX", "grocery": "yes", "pantry": [],
+        })
+
+        self.assertEqual(result["meals"], [])
+        self.assertFalse(result["has_more"])
+        self.assertEqual(result["notice"], PrepnGo.SPOON_UNAVAILABLE_NOTICE)
+        self.assertTrue(result["stores"])
+
+
+if __name__ == '__main__':
+    unittest.main()
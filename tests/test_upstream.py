@@ -0,0 +1,152 @@
+import threading
+import time
+import unittest
+import requests
+from requests.adapters import BaseAdapter
+from shared.upstream import Upstream, SingleFlight
+from shared.circuit import CircuitBreaker, CircuitOpenError
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Transport adapter that answers from a list of (status, headers) pairs."""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response.url = request.url
+        response.request = request
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+class TestUpstream(unittest.TestCase):
+    def make_client(self, script, **config):
+        self.sleeps = []
+        client = Upstream("test", "https://api.example.com", sleep=self.sleeps.append, **config)
+        self.adapter = ScriptedAdapter(script)
+        client.session.mount("https://api.example.com", self.adapter)
+        return client
+
+    def test_default_timeout_and_success(self):
+        client = self.make_client([(200, {})], connect_timeout=1, read_timeout=4)
+        response = client.get("/v1/thing")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.url, "https://api.example.com/v1/thing")
+        self.assertEqual(self.adapter.timeouts, [(1, 4)])
+
+    def test_retries_server_errors_with_backoff(self):
+        client = self.make_client([(503, {}), (502, {}), (200, {})], retries=2, backoff=0.1)
+        self.assertEqual(client.get("/x").status_code, 200)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(all(0 <= s <= 0.2 for s in self.sleeps))
+        self.assertEqual(client.stats()["retries"], 2)
+
+    def test_honours_retry_after(self):
+        client = self.make_client([(429, {"Retry-After": "2"}), (200, {})])
+        self.assertEqual(client.get("/x").status_code, 200)
+        self.assertEqual(self.sleeps, [2.0])
+
+    def test_gives_up_on_long_retry_after(self):
+        client = self.make_client([(429, {"Retry-After": "120"})], max_retry_after=30)
+        self.assertEqual(client.get("/x").status_code, 429)
+        self.assertEqual(self.sleeps, [])
+
+    def test_default_waits_only_a_few_seconds_for_retry_after(self):
+        client = self.make_client([(503, {"Retry-After": "10"})])
+        self.assertEqual(client.get("/x").status_code, 503)
+        self.assertEqual(self.sleeps, [])
+
+    def test_slow_calls_count_against_the_breaker_by_default(self):
+        client = self.make_client([], read_timeout=6)
+        self.assertEqual(client.breaker.slow_call_seconds, 3)
+
+    def test_client_errors_are_not_retried(self):
+        client = self.make_client([(404, {})])
+        self.assertEqual(client.get("/x").status_code, 404)
+        self.assertEqual(self.sleeps, [])
+
+    def test_connection_errors_raise_after_retries(self):
+        client = self.make_client([requests.ConnectionError("down")] * 2, retries=1)
+        with self.assertRaises(requests.ConnectionError):
+            client.get("/x")
+        self.assertEqual(client.stats()["failures"], 1)
+
+    def test_open_breaker_skips_the_network(self):
+        breaker = CircuitBreaker("test", min_calls=2)
+        client = self.make_client([(503, {}), (503, {})], retries=0, breaker=breaker)
+        client.get("/x")
+        client.get("/x")
+        with self.assertRaises(CircuitOpenError):
+            client.get("/x")
+        self.assertEqual(len(self.adapter.timeouts), 2)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def run_concurrently(self, flights, fn, count=5):
+        results = [None] * count
+        errors = [None] * count
+
+        def worker(i):
+            try:
+                results[i] = flights.do("same-key", fn)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_identical_calls_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return [{"name": "shared"}]
+
+        results, _ = self.run_concurrently(flights, fetch)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == [{"name": "shared"}] for r in results))
+        self.assertEqual(flights.stats()["coalesced"], 4)
+        # every caller gets its own copy to mutate
+        results[0][0]["name"] = "changed"
+        self.assertEqual(results[1][0]["name"], "shared")
+
+    def test_errors_are_shared(self):
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("upstream down")
+
+        _, errors = self.run_concurrently(flights, fail, count=3)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+        self.assertEqual(flights.stats()["in_flight"], 0)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        flights = SingleFlight()
+        flights.do("k", lambda: 1)
+        flights.do("k", lambda: 2)
+        self.assertEqual(flights.stats(), {"calls": 2, "coalesced": 0, "in_flight": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+from FoodiesRN import run_foodiesrn
+
+
+def make_page(offset, size, rating=4.0):
+    return [
+        {"name": f"R{offset + i}", "location": f"{offset + i} Main St", "rating": rating}
+        for i in range(size)
+    ]
+
+
+class TestAdaptiveYelpPaging(unittest.TestCase):
+    def run_search(self, pages, **kwargs):
+        calls = []
+
+        def fake_search(user_input, offset=0):
+            calls.append(offset)
+            return pages.get(offset, [])
+
+        with patch.object(run_foodiesrn, "search_yelp", side_effect=fake_search):
+            results = run_foodiesrn.search_yelp_adaptive({}, **kwargs)
+        return results, sorted(calls)
+
+    def test_dense_area_uses_one_call(self):
+        results, calls = self.run_search({0: make_page(0, 50)}, min_candidates=3, max_pages=3)
+        self.assertEqual(calls, [0])
+        self.assertEqual(len(results), 50)
+
+    def test_sparse_area_fetches_more_pages(self):
+        pages = {0: make_page(0, 50, rating=3.0), 50: make_page(50, 50, rating=3.0), 100: make_page(100, 50)}
+        results, calls = self.run_search(
+            pages, qualifies=lambda r: r["rating"] > 3.5, min_candidates=3, max_pages=3
+        )
+        self.assertEqual(calls, [0, 50, 100])
+        self.assertEqual(len(results), 150)
+        self.assertEqual(results[0]["name"], "R0")
+
+    def test_short_page_stops_paging(self):
+        results, calls = self.run_search({0: make_page(0, 10, rating=3.0)}, qualifies=lambda r: False)
+        self.assertEqual(calls, [0])
+        self.assertEqual(len(results), 10)
+
+    def test_page_cap_and_duplicates(self):
+        pages = {0: make_page(0, 50), 50: make_page(0, 50)}
+        results, calls = self.run_search(pages, qualifies=lambda r: False, max_pages=2)
+        self.assertEqual(calls, [0, 50])
+        self.assertEqual(len(results), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()